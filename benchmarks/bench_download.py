@@ -0,0 +1,153 @@
+"""
+End-to-end download benchmark against the local mock server.
+
+    python -m benchmarks.bench_download --assets 50 --file-size 4M --workers 8
+
+Reports files/s, MB/s, time to first byte and peak RSS.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from polydown.controller import PolydownController, console
+
+from .mock_server import MockConfig, MockPolyHaven
+
+
+@dataclass
+class BenchResult:
+    files: int
+    bytes: int
+    seconds: float
+    files_per_s: float
+    mb_per_s: float
+    ttfb: Optional[float]
+    peak_rss_mb: Optional[float]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_bytes(value: str) -> int:
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    value = value.strip().lower()
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+async def run_benchmark(
+    config: MockConfig,
+    folder: Optional[str] = None,
+    controller_options: Optional[dict] = None,
+    base_url: Optional[str] = None,
+) -> BenchResult:
+    """
+    Drive PolydownController.start end to end against a fresh mock server,
+    or against one already serving config at base_url. An external server
+    keeps its memory out of the peak RSS; files and bytes then come from
+    the run's own metrics and TTFB is not known.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        async with contextlib.AsyncExitStack() as stack:
+            server = None
+            if base_url is None:
+                server = await stack.enter_async_context(MockPolyHaven(config))
+                base_url = server.base_url
+            controller = PolydownController(
+                api_base_url=base_url,
+                progress="none",
+                **(controller_options or {}),
+            )
+            started = time.monotonic()
+            await controller.start(
+                asset_type=config.asset_type,
+                category=None,
+                folder=folder or tmpdir,
+                sizes=[],
+                overwrite=True,
+                noimgs=True,
+                iters=None,
+                tone=False,
+                fileformat="hdr",
+            )
+            seconds = time.monotonic() - started
+
+        if server:
+            files, nbytes = len(server.files_served), server.bytes_served
+            ttfb = server.first_file_byte_at - started if server.first_file_byte_at else None
+        else:
+            files, nbytes, ttfb = controller.metrics.file_count, controller.metrics.bytes, None
+        return BenchResult(
+            files=files,
+            bytes=nbytes,
+            seconds=seconds,
+            files_per_s=files / seconds if seconds else 0.0,
+            mb_per_s=nbytes / seconds / 1e6 if seconds else 0.0,
+            ttfb=ttfb,
+            peak_rss_mb=peak_rss_mb(),
+        )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--assets", type=int, default=20)
+    ap.add_argument("--sizes", nargs="+", default=["1k", "2k"])
+    ap.add_argument("--file-size", type=parse_bytes, default="1M")
+    ap.add_argument("--api-latency", type=float, default=0.0, help="seconds per API request")
+    ap.add_argument("--file-latency", type=float, default=0.0, help="seconds before each file starts")
+    ap.add_argument("--bandwidth", type=parse_bytes, default=None, help="bytes/s per connection, e.g. 20M")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--segments", type=int, default=1)
+    ap.add_argument("--schedule", default="fifo")
+    ap.add_argument("--server-url", default=None, help="use a mock server already serving the same catalogue")
+    ap.add_argument("--json", dest="json_path", default=None, help="also write the result to this file")
+    args = ap.parse_args(argv)
+
+    config = MockConfig(
+        assets=args.assets,
+        sizes=args.sizes,
+        file_size=args.file_size,
+        api_latency=args.api_latency,
+        file_latency=args.file_latency,
+        bandwidth=args.bandwidth,
+    )
+    options = {
+        "concurrency": args.workers,
+        "segments": args.segments,
+        "segment_threshold": 0,
+        "scheduling": args.schedule,
+        "use_manifest": False,
+    }
+    console.quiet = True
+    result = asyncio.run(run_benchmark(config, controller_options=options, base_url=args.server_url))
+    console.quiet = False
+
+    print(f"files:      {result.files}")
+    print(f"bytes:      {result.bytes:,}")
+    print(f"wall time:  {result.seconds:.3f} s")
+    print(f"files/s:    {result.files_per_s:.1f}")
+    print(f"MB/s:       {result.mb_per_s:.1f}")
+    print(f"TTFB:       {result.ttfb:.3f} s" if result.ttfb is not None else "TTFB:       n/a")
+    print(f"peak RSS:   {result.peak_rss_mb:.1f} MB" if result.peak_rss_mb is not None else "peak RSS:   n/a")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(asdict(result), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
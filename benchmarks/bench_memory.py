@@ -0,0 +1,73 @@
+"""
+Peak RSS of full runs as the catalogue grows.
+
+    python -m benchmarks.bench_memory --assets 250 1000 4000 --sizes 1k 2k 4k
+
+Every catalogue size runs in a fresh process (peak RSS only ever grows) with
+tiny files, so the numbers reflect task generation and bookkeeping rather
+than payload buffers. The mock server runs in a process of its own, so the
+RSS is the downloader's alone. Memory per asset should fall as the catalogue
+grows.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(assets: int, sizes: List[str], workers: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        json_path = f.name
+    catalogue = ["--assets", str(assets), "--sizes", *sizes, "--file-size", "1k"]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_server", *catalogue],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        base_url = server.stdout.readline().strip()
+        if not base_url:
+            raise RuntimeError("Mock server exited before serving")
+        subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_download",
+                *catalogue,
+                "--workers", str(workers),
+                "--server-url", base_url,
+                "--json", json_path,
+            ],
+            cwd=ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        with open(json_path) as f:
+            return json.load(f)
+    finally:
+        server.terminate()
+        server.wait()
+        os.remove(json_path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--assets", type=int, nargs="+", default=[250, 1000, 4000])
+    ap.add_argument("--sizes", nargs="+", default=["1k", "2k", "4k"])
+    ap.add_argument("--workers", type=int, default=16)
+    args = ap.parse_args(argv)
+
+    print(f"{'assets':>8} {'files':>8} {'seconds':>8} {'peak RSS MB':>12} {'KB/asset':>9}")
+    for assets in args.assets:
+        result = measure(assets, args.sizes, args.workers)
+        rss = result["peak_rss_mb"]
+        per_asset = rss * 1024 / assets if rss is not None else float("nan")
+        print(f"{assets:>8} {result['files']:>8} {result['seconds']:>8.2f} {rss:>12.1f} {per_asset:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
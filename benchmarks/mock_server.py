@@ -0,0 +1,225 @@
+"""
+Local aiohttp stand-in for the Poly Haven API and file hosts.
+
+    python -m benchmarks.mock_server --assets 1000 --sizes 1k 2k --file-size 1k
+
+serves on its own, printing the base URL, until interrupted.
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from aiohttp import web
+
+BODY_BLOCK = bytes(range(256)) * 256  # 64 KiB
+
+
+@dataclass
+class MockConfig:
+    assets: int = 20
+    sizes: List[str] = field(default_factory=lambda: ["1k", "2k"])
+    file_size: int = 1024 * 1024
+    api_latency: float = 0.0
+    file_latency: float = 0.0
+    bandwidth: Optional[int] = None  # bytes/s per connection, None = unlimited
+    asset_type: str = "hdris"
+    fail_first: int = 0  # 503 responses per file before it is served
+
+
+class MockPolyHaven:
+    """
+    Serves /types, /categories, /assets, /files/{id} and the file payloads.
+    Every file is ``file_size`` bytes: a shared body followed by a 32 byte
+    trailer naming the file, so MD5s differ without hashing every payload.
+    """
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.host = "127.0.0.1"
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+        self.first_file_byte_at: Optional[float] = None
+        self.bytes_served = 0
+        self.requests: Dict[str, int] = {}
+        self.files_served: Set[str] = set()
+        self.failures: Dict[str, int] = {}
+
+        body_len = max(config.file_size - 32, 0)
+        self._body_len = body_len
+        body_hasher = hashlib.md5()
+        for offset in range(0, body_len, len(BODY_BLOCK)):
+            body_hasher.update(BODY_BLOCK[:min(len(BODY_BLOCK), body_len - offset)])
+        self._body_hasher = body_hasher
+
+        self.asset_ids = [f"asset_{i:05d}" for i in range(config.assets)]
+        self._md5: Dict[str, str] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _trailer(self, name: str) -> bytes:
+        return name.encode().ljust(32, b"#")[:32]
+
+    def md5_for(self, name: str) -> str:
+        if name not in self._md5:
+            hasher = self._body_hasher.copy()
+            hasher.update(self._trailer(name))
+            self._md5[name] = hasher.hexdigest()
+        return self._md5[name]
+
+    def _file_info(self, asset_id: str, size: str, ext: str) -> dict:
+        name = f"{asset_id}_{size}.{ext}"
+        return {
+            "url": f"{self.base_url}/dl/{name}",
+            "md5": self.md5_for(name),
+            "size": self._body_len + 32,
+        }
+
+    def files_for(self, asset_id: str) -> dict:
+        if self.config.asset_type == "hdris":
+            return {"hdri": {size: {"hdr": self._file_info(asset_id, size, "hdr")} for size in self.config.sizes}}
+        return {
+            "blend": {
+                size: {"blend": {**self._file_info(asset_id, size, "blend"), "include": {}}}
+                for size in self.config.sizes
+            }
+        }
+
+    def _count(self, route: str):
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+    async def _api_delay(self):
+        if self.config.api_latency:
+            await asyncio.sleep(self.config.api_latency)
+
+    async def types(self, request):
+        self._count("types")
+        await self._api_delay()
+        return web.json_response(["hdris", "textures", "models"])
+
+    async def categories(self, request):
+        self._count("categories")
+        await self._api_delay()
+        return web.json_response({"all": len(self.asset_ids)})
+
+    async def assets(self, request):
+        self._count("assets")
+        await self._api_delay()
+        return web.json_response({asset_id: {} for asset_id in self.asset_ids})
+
+    async def files(self, request):
+        self._count("files")
+        await self._api_delay()
+        asset_id = request.match_info["asset_id"]
+        if asset_id not in self.asset_ids:
+            raise web.HTTPNotFound()
+        return web.json_response(self.files_for(asset_id))
+
+    async def download(self, request):
+        name = request.match_info["name"]
+        total = self._body_len + 32
+        start, end = 0, total - 1
+        status = 200
+
+        range_header = request.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            first, _, last = range_header[len("bytes="):].partition("-")
+            start = int(first)
+            end = int(last) if last else total - 1
+            if start >= total:
+                raise web.HTTPRequestRangeNotSatisfiable(headers={"Content-Range": f"bytes */{total}"})
+            status = 206
+
+        if self.config.file_latency:
+            await asyncio.sleep(self.config.file_latency)
+
+        headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start + 1), "ETag": f'"{self.md5_for(name)}"'}
+        if status == 206:
+            headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        if request.method == "HEAD":
+            return web.Response(status=status, headers=headers)
+
+        if self.failures.get(name, 0) < self.config.fail_first:
+            self.failures[name] = self.failures.get(name, 0) + 1
+            raise web.HTTPServiceUnavailable(headers={"Retry-After": "0"})
+
+        self._count("dl")
+        self.files_served.add(name)
+        response = web.StreamResponse(status=status, headers=headers)
+        await response.prepare(request)
+
+        if self.first_file_byte_at is None:
+            self.first_file_byte_at = time.monotonic()
+
+        trailer = self._trailer(name)
+        position = start
+        while position <= end:
+            if position < self._body_len:
+                block_offset = position % len(BODY_BLOCK)
+                n = min(len(BODY_BLOCK) - block_offset, self._body_len - position, end - position + 1)
+                data = BODY_BLOCK[block_offset:block_offset + n]
+            else:
+                t = position - self._body_len
+                data = trailer[t:t + end - position + 1]
+            await response.write(data)
+            position += len(data)
+            self.bytes_served += len(data)
+            if self.config.bandwidth:
+                await asyncio.sleep(len(data) / self.config.bandwidth)
+
+        await response.write_eof()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/types", self.types)
+        app.router.add_get("/categories/{asset_type}", self.categories)
+        app.router.add_get("/assets", self.assets)
+        app.router.add_get("/files/{asset_id}", self.files)
+        app.router.add_get("/dl/{name}", self.download)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, 0).start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+
+async def serve(config: MockConfig):
+    async with MockPolyHaven(config) as server:
+        print(server.base_url, flush=True)
+        await asyncio.Event().wait()
+
+
+def main(argv=None):
+    # Imported here: bench_download imports this module
+    from .bench_download import parse_bytes
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--assets", type=int, default=20)
+    ap.add_argument("--sizes", nargs="+", default=["1k", "2k"])
+    ap.add_argument("--file-size", type=parse_bytes, default="1M")
+    args = ap.parse_args(argv)
+    config = MockConfig(assets=args.assets, sizes=args.sizes, file_size=args.file_size)
+    try:
+        asyncio.run(serve(config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,106 +1,318 @@
 import argparse
 import datetime
-from .cli import polycli
+import sys
 
 __version__ = "0.4.0"
 
-ap = argparse.ArgumentParser()
-ap.add_argument(
-    "asset_type",
-    type=str,
-    nargs="*",
-    help='"hdris, textures, models"',
-)
-ap.add_argument(
-    "-f",
-    "--folder",
-    action="store",
-    type=str,
-    default="",
-    help="target download folder.",
-)
-ap.add_argument(
-    "-c",
-    "--category",
-    nargs="?",
-    const="",
-    help="category to download.",
-)
-ap.add_argument(
-    "-s",
-    "--sizes",
-    nargs="+",
-    default=[],
-    help="size(s) of downloaded asset files. eg: 1k 2k 4k",
-)
-ap.add_argument(
-    "-it",
-    "--iters",
-    action="store",
-    type=int,
-    default=-1,
-    help="amount of iterations.",
-)
-ap.add_argument(
-    "-ff",
-    "--fileformat",
-    action="store",
-    type=str,
-    default="hdr",
-    help="file format for hdris (hdr, exr).",
-)
-ap.add_argument(
-    "-o",
-    "--overwrite",
-    action="store_true",
-    default=False,
-    help="Overwrite if the files already exists.  otherwise the current task will be skipped.",
-)
-ap.add_argument(
-    "-t",
-    "--tone",
-    action="store_true",
-    default=False,
-    help="Download 8K Tonemapped JPG (only HDRIs).",
-)
-ap.add_argument(
-    "-no",
-    "--noimgs",
-    action="store_true",
-    default=False,
-    help="Do not download 'preview, render, thumbnail...' images.",
-)
-ap.add_argument(
-    "-w",
-    "--workers",
-    action="store",
-    type=int,
-    default=4,
-    help="number of concurrent download workers.",
-)
-ap.add_argument("-v", "--version", action="version", version="%(prog)s v" + __version__)
-ap.add_argument(
-    "-tf",
-    "--texture-format",
-    action="store",
-    type=str,
-    default=None,
-    choices=["jpg", "png", "exr"],
-    help="texture file format (jpg, png, exr).",
-)
-ap.add_argument(
-    "--maps",
-    nargs="*",
-    default=None,
-    help="maps to download (e.g. diffuse, rough, arm, etc). If used without values, lists available common map types.",
-)
-args = ap.parse_args()
 
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "asset_type",
+        type=str,
+        nargs="*",
+        help='"hdris, textures, models", optionally prefixed with "sync", "verify" or "plan"; or "apply <plan.jsonl>"',
+    )
+    ap.add_argument(
+        "-f",
+        "--folder",
+        action="store",
+        type=str,
+        default="",
+        help="target download folder.",
+    )
+    ap.add_argument(
+        "-c",
+        "--category",
+        nargs="?",
+        const="",
+        help="category to download.",
+    )
+    ap.add_argument(
+        "-s",
+        "--sizes",
+        nargs="+",
+        default=[],
+        help="size(s) of downloaded asset files. eg: 1k 2k 4k",
+    )
+    ap.add_argument(
+        "-it",
+        "--iters",
+        action="store",
+        type=int,
+        default=-1,
+        help="amount of iterations.",
+    )
+    ap.add_argument(
+        "-ff",
+        "--fileformat",
+        action="store",
+        type=str,
+        default="hdr",
+        help="file format for hdris (hdr, exr).",
+    )
+    ap.add_argument(
+        "-o",
+        "--overwrite",
+        action="store_true",
+        default=False,
+        help="Overwrite if the files already exists.  otherwise the current task will be skipped.",
+    )
+    ap.add_argument(
+        "-t",
+        "--tone",
+        action="store_true",
+        default=False,
+        help="Download 8K Tonemapped JPG (only HDRIs).",
+    )
+    ap.add_argument(
+        "-no",
+        "--noimgs",
+        action="store_true",
+        default=False,
+        help="Do not download 'preview, render, thumbnail...' images.",
+    )
+    ap.add_argument(
+        "-w",
+        "--workers",
+        action="store",
+        type=int,
+        default=4,
+        help="number of concurrent download workers.",
+    )
+    ap.add_argument("-v", "--version", action="version", version="%(prog)s v" + __version__)
+    ap.add_argument(
+        "-tf",
+        "--texture-format",
+        action="store",
+        type=str,
+        default=None,
+        choices=["jpg", "png", "exr"],
+        help="texture file format (jpg, png, exr).",
+    )
+    ap.add_argument(
+        "--maps",
+        nargs="*",
+        default=None,
+        help="maps to download (e.g. diffuse, rough, arm, etc). If used without values, lists available common map types.",
+    )
+    ap.add_argument(
+        "--segments",
+        action="store",
+        type=int,
+        default=1,
+        help="split large files into this many concurrent byte-range connections.",
+    )
+    ap.add_argument(
+        "--segment-threshold",
+        action="store",
+        type=int,
+        default=64,
+        help="minimum file size in MB for segmented downloads (default: 64).",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        action="store",
+        type=str,
+        default=None,
+        help="folder for cached API metadata (default: ~/.cache/polydown).",
+    )
+    ap.add_argument(
+        "--cache-ttl",
+        action="store",
+        type=float,
+        default=12,
+        help="hours before cached API metadata is revalidated (default: 12).",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Do not read or write the API metadata cache.",
+    )
+    ap.add_argument(
+        "--offline-metadata",
+        action="store_true",
+        default=False,
+        help="Use only cached API metadata, never contact the API.",
+    )
+    ap.add_argument(
+        "--no-manifest",
+        action="store_true",
+        default=False,
+        help="Do not use the library manifest; rehash every existing file.",
+    )
+    ap.add_argument(
+        "--deep-verify",
+        action="store_true",
+        default=False,
+        help="rehash existing files even when the manifest vouches for them, and refresh the manifest.",
+    )
+    ap.add_argument(
+        "--prune",
+        action="store_true",
+        default=False,
+        help="with 'sync': delete manifest-tracked files that are not part of the current selection.",
+    )
+    ap.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=False,
+        help="adjust the number of active downloads to the measured throughput, starting at --workers.",
+    )
+    ap.add_argument(
+        "--min-workers",
+        action="store",
+        type=int,
+        default=1,
+        help="lowest number of active downloads with --adaptive (default: 1).",
+    )
+    ap.add_argument(
+        "--max-workers",
+        action="store",
+        type=int,
+        default=16,
+        help="highest number of active downloads with --adaptive (default: 16).",
+    )
+    ap.add_argument(
+        "--metadata-workers",
+        action="store",
+        type=int,
+        default=10,
+        help="number of concurrent metadata requests (default: 10).",
+    )
+    ap.add_argument(
+        "--schedule",
+        action="store",
+        type=str,
+        default="fifo",
+        choices=["fifo", "largest", "smallest", "interleaved"],
+        help="download order by file size (default: fifo).",
+    )
+    ap.add_argument(
+        "--progress",
+        action="store",
+        type=str,
+        default="rich",
+        choices=["rich", "jsonl", "none"],
+        help="progress output: live view (rich), JSON-lines events on stdout (jsonl) or none.",
+    )
+    ap.add_argument(
+        "--chunk-size",
+        action="store",
+        type=int,
+        default=64,
+        help="network read size in KB (default: 64).",
+    )
+    ap.add_argument(
+        "--store",
+        action="store",
+        type=str,
+        default=None,
+        help="content-addressed store folder; files are downloaded once and hardlinked into place.",
+    )
+    ap.add_argument(
+        "--processes",
+        action="store",
+        type=int,
+        default=None,
+        help="with 'verify': number of hashing processes (default: CPU count).",
+    )
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="resolve the selection and report files and bytes by type, size, format and map, what is already present and an ETA.",
+    )
+    ap.add_argument(
+        "--probe-seconds",
+        action="store",
+        type=float,
+        default=3.0,
+        help="with --dry-run: measure throughput this long when no earlier run was recorded; 0 disables (default: 3).",
+    )
+    ap.add_argument(
+        "--max-bytes",
+        action="store",
+        type=str,
+        default=None,
+        help="byte budget such as 50G: every asset gets the largest size (of -s, if given) that keeps the total within it.",
+    )
+    ap.add_argument(
+        "--download-processes",
+        action="store",
+        type=int,
+        default=1,
+        help="download in N processes, each with its own event loop and --workers connections (default: 1).",
+    )
+    ap.add_argument(
+        "--metrics-json",
+        action="store",
+        type=str,
+        default=None,
+        help="write phase timings, per-host request latencies and per-file throughput to this JSON file.",
+    )
+    ap.add_argument(
+        "--metrics-prom",
+        action="store",
+        type=str,
+        default=None,
+        help="write the run metrics as a Prometheus textfile (node_exporter textfile collector).",
+    )
+    ap.add_argument(
+        "--retries",
+        action="store",
+        type=int,
+        default=4,
+        help="attempts per API request and per file before giving up (default: 4).",
+    )
+    ap.add_argument(
+        "--retry-delay",
+        action="store",
+        type=float,
+        default=1.0,
+        help="base backoff delay in seconds, doubled on every attempt; Retry-After takes precedence (default: 1).",
+    )
+    ap.add_argument(
+        "--failed-output",
+        action="store",
+        type=str,
+        default=None,
+        help="where to write permanently failed tasks as JSON lines (default: <folder>/.polydown-failed.jsonl).",
+    )
+    ap.add_argument(
+        "--output",
+        action="store",
+        type=str,
+        default="plan.jsonl",
+        help="with 'plan': file to write the resolved download plan to (default: plan.jsonl).",
+    )
+    ap.add_argument(
+        "--shard",
+        action="store",
+        type=str,
+        default=None,
+        help="download only shard i of N (e.g. 2/4); N machines with the same arguments cover the catalogue once.",
+    )
+    ap.add_argument(
+        "--shard-by",
+        action="store",
+        type=str,
+        default="assets",
+        choices=["assets", "bytes"],
+        help="partition whole assets by ID hash (default) or individual files balanced by byte size.",
+    )
+    return ap
 
-def cli():
+
+def main(argv=None) -> int:
+    """Parse argv and run polydown. --help and --version never import the download engine."""
+    args = build_parser().parse_args(argv)
     if args.asset_type == []:
         print("<asset_type> is required.")
-        exit(0)
+        return 0
+
+    # aiohttp and the download engine account for most of the startup time
+    from .cli import polycli
 
     execution_start_time = datetime.datetime.now()
 
@@ -110,6 +322,11 @@ def cli():
         print("\nKeyboardInterrupt!")
 
     print("Total runtime: {}".format(datetime.datetime.now() - execution_start_time))
+    return 0
+
+
+def cli():
+    sys.exit(main())
 
 
 if __name__ == "__main__":
@@ -1,22 +1,77 @@
+import time
 import aiohttp
 from typing import List, Optional, Dict, Any
 
+from .cache import CacheEntry, MetadataCache
+from .retry import RetryPolicy
+
+
+class OfflineMetadataError(RuntimeError):
+    """Raised when offline mode needs a response that is not cached."""
+
+
 class PolyHavenClient:
     BASE_URL = "https://api.polyhaven.com"
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache: Optional[MetadataCache] = None,
+        offline: bool = False,
+        base_url: Optional[str] = None,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        self.base_url = base_url or self.BASE_URL
         self.session = session
         self._own_session = False
+        self.cache = cache
+        self.offline = offline
+        self.retry = retry
 
     async def _get(self, endpoint: str) -> Any:
+        url = f"{self.base_url}{endpoint}"
+
+        entry = self.cache.get(url) if self.cache else None
+        if entry and (self.offline or self.cache.is_fresh(entry)):
+            return entry.data
+        if self.offline:
+            raise OfflineMetadataError(f"No cached metadata for {url}")
+
         if not self.session:
              self.session = aiohttp.ClientSession()
              self._own_session = True
 
-        url = f"{self.BASE_URL}{endpoint}"
-        async with self.session.get(url) as response:
+        # Revalidate a stale entry instead of refetching it blindly
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        kwargs = {"headers": headers} if headers else {}
+
+        if self.retry:
+            return await self.retry.call(lambda: self._fetch(url, entry, kwargs))
+        return await self._fetch(url, entry, kwargs)
+
+    async def _fetch(self, url: str, entry: Optional[CacheEntry], kwargs: dict) -> Any:
+        async with self.session.get(url, **kwargs) as response:
+            if entry and response.status == 304:
+                entry.fetched_at = time.time()
+                self.cache.put(url, entry)
+                return entry.data
+
             response.raise_for_status()
-            return await response.json()
+            data = await response.json()
+
+            if self.cache:
+                self.cache.put(url, CacheEntry(
+                    data=data,
+                    fetched_at=time.time(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                ))
+            return data
 
     async def close(self):
         if self._own_session and self.session:
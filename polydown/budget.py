@@ -0,0 +1,63 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .downloader import DownloadTask
+
+_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte count such as "750M", "20G" or "1.5T" (binary units, optional trailing B)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*", value.lower())
+    if not match:
+        raise ValueError(f"Invalid size '{value}', expected a number with an optional K/M/G/T suffix")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+@dataclass
+class Rung:
+    """One way to download an asset: every file of a single size (and format)."""
+
+    label: str
+    tasks: List[DownloadTask] = field(default_factory=list)
+
+    @property
+    def bytes(self) -> int:
+        # Files without a size in the metadata are free as far as the budget knows
+        return sum(task.size or 0 for task in self.tasks)
+
+
+def build_ladder(rungs: List[Rung]) -> List[Rung]:
+    """Non-empty rungs, smallest first."""
+    return sorted((rung for rung in rungs if rung.tasks), key=lambda rung: rung.bytes)
+
+
+def fit_to_budget(ladders: Dict[str, List[Rung]], max_bytes: int) -> Dict[str, Rung]:
+    """
+    Choose one rung per asset so the total stays within max_bytes.
+    Every asset starts on its smallest rung, in the given order, and assets
+    that do not fit even then are left out. The rest are then raised one
+    rung at a time, round-robin, for as long as the next rung still fits,
+    so the budget goes to a uniform resolution rather than to a few assets.
+    """
+    levels: Dict[str, int] = {}
+    total = 0
+    for asset, ladder in ladders.items():
+        if ladder and total + ladder[0].bytes <= max_bytes:
+            levels[asset] = 0
+            total += ladder[0].bytes
+
+    raised = True
+    while raised:
+        raised = False
+        for asset, level in levels.items():
+            ladder = ladders[asset]
+            if level + 1 < len(ladder):
+                extra = ladder[level + 1].bytes - ladder[level].bytes
+                if total + extra <= max_bytes:
+                    levels[asset] = level + 1
+                    total += extra
+                    raised = True
+
+    return {asset: ladders[asset][level] for asset, level in levels.items()}
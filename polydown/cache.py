@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "polydown")
+
+
+@dataclass
+class CacheEntry:
+    data: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class MetadataCache:
+    """On-disk cache of API responses, one JSON file per URL."""
+
+    def __init__(self, directory: Optional[str] = None, ttl: float = 12 * 3600):
+        self.directory = directory or default_cache_dir()
+        self.ttl = ttl
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            return CacheEntry(
+                data=raw["data"],
+                fetched_at=raw["fetched_at"],
+                etag=raw.get("etag"),
+                last_modified=raw.get("last_modified"),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def put(self, url: str, entry: CacheEntry) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "url": url,
+                    "data": entry.data,
+                    "fetched_at": entry.fetched_at,
+                    "etag": entry.etag,
+                    "last_modified": entry.last_modified,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
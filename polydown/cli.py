@@ -1,10 +1,16 @@
 import asyncio
 import os
-import aiohttp
-from rich import print
+import sys
+from rich import get_console, print
 
-from .controller import PolydownController
-from .api import PolyHavenClient
+from .controller import PolydownController, console as controller_console
+from .budget import parse_size
+from .cache import MetadataCache
+from .metrics import RunMetrics
+from .retry import RetryPolicy
+from .sharding import parse_shard
+from .store import BlobStore
+from .tasklist import PlanCheckpoint, plan_digest, plan_record, read_task_list, write_task_list
 
 
 def polycli(args):
@@ -15,7 +21,19 @@ def polycli(args):
 
 
 async def _async_polycli(args):
-    asset_type = args.asset_type[0]
+    # "polydown sync <asset_type>" compares remote MD5s instead of skipping existing files
+    # "polydown verify <asset_type>" checks the library in --folder without downloading
+    # "polydown plan <asset_type> --output plan.jsonl" resolves the task list without downloading
+    # "polydown apply <plan.jsonl>" downloads a plan (or a failed task list) without the API
+    positionals = list(args.asset_type)
+    command = positionals[0] if positionals[0] in ("sync", "verify", "plan", "apply") else None
+    if command:
+        positionals = positionals[1:]
+    sync = command == "sync"
+    if not positionals:
+        print("<asset_type> is required.")
+        return
+    asset_type = positionals[0]
     folder = args.folder
     overwrite = args.overwrite
     sizes = args.sizes
@@ -27,98 +45,259 @@ async def _async_polycli(args):
     texture_format = args.texture_format
     maps = args.maps
 
-    # Validation Phase
-    async with aiohttp.ClientSession() as session:
-        client = PolyHavenClient(session)
+    metadata_cache = None
+    if not args.no_cache:
+        metadata_cache = MetadataCache(args.cache_dir, ttl=args.cache_ttl * 3600)
+    offline_metadata = args.offline_metadata
+    if offline_metadata and metadata_cache is None:
+        print("[red]--offline-metadata requires the metadata cache.[/red]")
+        return
+
+    if args.progress == "jsonl":
+        # Keep stdout free for the JSON-lines events
+        controller_console.file = sys.stderr
+        get_console().file = sys.stderr
 
-        # ->🔒asset type->
+    shard = None
+    if args.shard:
         try:
-            asset_type_list = await client.get_asset_types()
-        except Exception as e:
-            print(f"[red]Error connecting to API: {e}[/red]")
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"[red]{e}[/red]")
             return
 
-        if asset_type not in asset_type_list:
-            print(f"'{asset_type}' is not a valid asset type!")
+    max_bytes = None
+    if args.max_bytes:
+        try:
+            max_bytes = parse_size(args.max_bytes)
+        except ValueError as e:
+            print(f"[red]{e}[/red]")
             return
 
-        # ->🔒maps list->
-        if maps is not None and len(maps) == 0:
-            print(f"[green]Common available map types for {asset_type} (actual availability varies per asset):[/green]")
-            common_maps = [
-                "Diffuse", "Rough", "nor_gl", "nor_dx", "disp", 
-                "ao", "arm", "spec", "alpha", "metal", 
-                "diff", "roughness", "displacement", "metallic"
-            ]
-            for m in common_maps:
-                print(f"- {m}")
-            return
+    workers = args.workers
 
-        # ->🔒category->
-        if category == "":
-            try:
-                js = await client.get_categories(asset_type)
-                print(f"[green]There are {len(js)} available categories for {asset_type}:")
-                print(js)
+    controller = PolydownController(
+        concurrency=workers,
+        segments=args.segments,
+        segment_threshold=args.segment_threshold * 1024 * 1024,
+        metadata_cache=metadata_cache,
+        offline_metadata=offline_metadata,
+        use_manifest=not args.no_manifest,
+        deep_verify=args.deep_verify,
+        adaptive=args.adaptive,
+        min_concurrency=args.min_workers,
+        max_concurrency=args.max_workers,
+        metadata_concurrency=args.metadata_workers,
+        scheduling=args.schedule,
+        progress=args.progress,
+        chunk_size=args.chunk_size * 1024,
+        store=BlobStore(args.store) if args.store else None,
+        # Per-file records only end up in the JSON report
+        metrics=RunMetrics(per_file=bool(args.metrics_json)),
+        retry=RetryPolicy(attempts=max(args.retries, 1), base_delay=args.retry_delay),
+        failed_output=args.failed_output,
+        shard=shard,
+        shard_by=args.shard_by,
+        processes=max(args.download_processes, 1),
+        max_bytes=max_bytes,
+    )
+
+    try:
+        # One session pool serves both the validation phase and the downloads
+        async with controller.create_session_pool() as sessions:
+            controller.sessions = sessions
+
+            if command == "apply":
+                # A plan carries URLs, destinations, sizes and MD5s, the API is not needed
+                plan_path = asset_type
+                down_folder = os.path.abspath(folder or os.getcwd())
+                try:
+                    tasks = read_task_list(plan_path, root=down_folder)
+                    digest = plan_digest(plan_path)
+                except (OSError, ValueError, TypeError) as e:
+                    print(f"[red]Cannot read plan {plan_path}: {e}[/red]")
+                    return
+                checkpoint = PlanCheckpoint(f"{plan_path}.done", plan_digest=digest)
+                try:
+                    await controller.apply(tasks, down_folder, checkpoint)
+                finally:
+                    checkpoint.close()
                 return
+
+            # Validation Phase
+            # Same cache and retry policy as the metadata fetched during the run
+            client = controller._client(sessions)
+
+            # ->🔒asset type->
+            try:
+                with controller.metrics.phase("validation"):
+                    asset_type_list = await client.get_asset_types()
             except Exception as e:
-                print(f"[red]Error fetching categories: {e}[/red]")
+                print(f"[red]Error connecting to API: {e}[/red]")
                 return
-        elif category is not None:
-            try:
-                asset_category_list = await client.get_categories(asset_type)
-                if category not in asset_category_list:
-                    print(
-                        f"[red]{category} is not a valid category.[/red]\nEnter empty '-c' argument to get the category list of the {asset_type}."
-                    )
+
+            if asset_type not in asset_type_list:
+                print(f"'{asset_type}' is not a valid asset type!")
+                return
+
+            # ->🔒maps list->
+            if maps is not None and len(maps) == 0:
+                print(f"[green]Common available map types for {asset_type} (actual availability varies per asset):[/green]")
+                common_maps = [
+                    "Diffuse", "Rough", "nor_gl", "nor_dx", "disp", 
+                    "ao", "arm", "spec", "alpha", "metal", 
+                    "diff", "roughness", "displacement", "metallic"
+                ]
+                for m in common_maps:
+                    print(f"- {m}")
+                return
+
+            # ->🔒category->
+            if category == "":
+                try:
+                    js = await client.get_categories(asset_type)
+                    print(f"[green]There are {len(js)} available categories for {asset_type}:")
+                    print(js)
                     return
-            except Exception as e:
-                print(f"[red]Error validating category: {e}[/red]")
+                except Exception as e:
+                    print(f"[red]Error fetching categories: {e}[/red]")
+                    return
+            elif category is not None:
+                try:
+                    with controller.metrics.phase("validation"):
+                        asset_category_list = await client.get_categories(asset_type)
+                    if category not in asset_category_list:
+                        print(
+                            f"[red]{category} is not a valid category.[/red]\nEnter empty '-c' argument to get the category list of the {asset_type}."
+                        )
+                        return
+                except Exception as e:
+                    print(f"[red]Error validating category: {e}[/red]")
+                    return
+
+            # ->🔒file_format->
+            if asset_type == "hdris" and fileformat not in ["exr", "hdr"]:
+                print(f"[red]{fileformat} is not a valid file format for {asset_type}.[/red]")
                 return
 
-    # ->🔒file_format->
-    if asset_type == "hdris" and fileformat not in ["exr", "hdr"]:
-        print(f"[red]{fileformat} is not a valid file format for {asset_type}.[/red]")
-        return
+            # ->🔒folder->
+            # Handle empty folder arg -> current directory
+            if folder == "":
+                folder = os.getcwd()
 
-    # ->🔒folder->
-    # Handle empty folder arg -> current directory
-    if folder == "":
-        folder = os.getcwd()
+            down_folder = os.path.abspath(folder)
 
-    down_folder = os.path.abspath(folder)
-    if not os.path.exists(down_folder):
-        try:
-            os.makedirs(down_folder, exist_ok=True)
-            print(f'"{folder}" folder not found, creating...')
-        except Exception as e:
-            print("[red]Error: " + str(e))
-            return
+            # Iters handling: -1 means all, so None for controller
+            iter_limit = iters if iters != -1 else None
 
-    print(
-        f"\n[cyan]🔗(polyhaven.com/{asset_type}"
-        + (f"/{category}" if category is not None else "")
-        + ("['all sizes']" if sizes == [] else str(sizes))
-        + f")=>🏠"
-        + (f"({folder})" if folder else "")
-        + "\n"
-    )
+            if command == "plan":
+                tasks = await controller.plan(
+                    asset_type=asset_type,
+                    category=category,
+                    folder=down_folder,
+                    sizes=sizes,
+                    overwrite=overwrite,
+                    noimgs=noimgs,
+                    iters=iter_limit,
+                    tone=tone,
+                    fileformat=fileformat,
+                    texture_format=args.texture_format,
+                    maps=args.maps,
+                )
+                write_task_list(args.output, [plan_record(task, down_folder) for task in tasks])
+                total = sum(task.size or 0 for task in tasks)
+                print(f"[green]Wrote {len(tasks)} tasks ({total:,} bytes) to {args.output}.")
+                return
 
-    # Iters handling: -1 means all, so None for controller
-    iter_limit = iters if iters != -1 else None
-    workers = args.workers
+            if args.dry_run:
+                await controller.estimate(
+                    asset_type=asset_type,
+                    category=category,
+                    folder=down_folder,
+                    sizes=sizes,
+                    overwrite=overwrite,
+                    noimgs=noimgs,
+                    iters=iter_limit,
+                    tone=tone,
+                    fileformat=fileformat,
+                    texture_format=args.texture_format,
+                    maps=args.maps,
+                    probe_seconds=args.probe_seconds,
+                )
+                return
 
-    controller = PolydownController(concurrency=workers)
-    await controller.start(
-        asset_type=asset_type,
-        category=category,
-        folder=down_folder,
-        sizes=sizes,
-        overwrite=overwrite,
-        noimgs=noimgs,
-        iters=iter_limit,
-        tone=tone,
-        fileformat=fileformat,
-        texture_format=args.texture_format,
-        maps=args.maps,
-    )
+            if not os.path.exists(down_folder):
+                try:
+                    os.makedirs(down_folder, exist_ok=True)
+                    print(f'"{folder}" folder not found, creating...')
+                except Exception as e:
+                    print("[red]Error: " + str(e))
+                    return
+
+            print(
+                f"\n[cyan]🔗(polyhaven.com/{asset_type}"
+                + (f"/{category}" if category is not None else "")
+                + ("['all sizes']" if sizes == [] else str(sizes))
+                + f")=>🏠"
+                + (f"({folder})" if folder else "")
+                + "\n"
+            )
+
+            if command == "verify":
+                report = await controller.verify(
+                    asset_type=asset_type,
+                    category=category,
+                    folder=down_folder,
+                    sizes=sizes,
+                    noimgs=noimgs,
+                    iters=iter_limit,
+                    tone=tone,
+                    fileformat=fileformat,
+                    texture_format=args.texture_format,
+                    maps=args.maps,
+                    processes=args.processes,
+                )
+                if report is not None and not report.healthy:
+                    sys.exit(1)
+                return
+
+            if args.prune and not sync:
+                print("[red]--prune is only available with 'polydown sync'.[/red]")
+                return
+            # Pruning compares with the whole catalogue; a partial selection would only hide that
+            prune_filters = {
+                "--iters": iter_limit is not None,
+                "-s": bool(sizes),
+                "-c": category is not None,
+                "--maps": maps is not None,
+                "-tf": texture_format is not None,
+                "-no": noimgs,
+                "--max-bytes": max_bytes is not None,
+                "--shard": shard is not None,
+            }
+            used = [flag for flag, active in prune_filters.items() if active]
+            if args.prune and used:
+                print(f"[red]--prune cannot be combined with {', '.join(used)}.[/red]")
+                return
+
+            await controller.start(
+                asset_type=asset_type,
+                category=category,
+                folder=down_folder,
+                sizes=sizes,
+                overwrite=overwrite,
+                noimgs=noimgs,
+                iters=iter_limit,
+                tone=tone,
+                fileformat=fileformat,
+                texture_format=args.texture_format,
+                maps=args.maps,
+                sync=sync,
+                prune=args.prune,
+            )
+    finally:
+        # Written even for failed or cancelled runs, which are the interesting ones
+        if args.metrics_json:
+            controller.metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            controller.metrics.write_prometheus(args.metrics_prom)
@@ -0,0 +1,122 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+
+class AdaptiveLimiter:
+    """
+    Semaphore whose limit follows an AIMD rule.
+    Every ``interval`` seconds the aggregate throughput of the last window is
+    measured. The limit grows by one while throughput keeps up and every slot
+    is busy, and is cut by ``decrease_factor`` when the window saw a 429/5xx
+    response or time-to-first-byte more than doubled over the best window.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        interval: float = 2.0,
+        decrease_factor: float = 0.5,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.interval = interval
+        self.decrease_factor = decrease_factor
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_latencies: List[float] = []
+        self._saturated = False
+        self._last_throughput = 0.0
+        self._base_latency: Optional[float] = None
+
+        self.peak_throughput = 0.0
+        self.peak_limit = self.limit
+
+    async def acquire(self):
+        while self._active >= self.limit:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # Pass the wake-up on to the next waiter
+                    self._wake()
+                raise
+        self._active += 1
+        if self._active >= self.limit:
+            self._saturated = True
+
+    def release(self):
+        self._active -= 1
+        self._wake()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def _wake(self):
+        free = self.limit - self._active
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+    def record_bytes(self, n: int):
+        self._window_bytes += n
+        self._maybe_adjust()
+
+    def record_latency(self, seconds: float):
+        self._window_latencies.append(seconds)
+
+    def record_error(self, status: Optional[int] = None):
+        """Report a failed request. Only 429 and 5xx count as congestion."""
+        if status is None or status == 429 or status >= 500:
+            self._window_errors += 1
+        self._maybe_adjust()
+
+    def _maybe_adjust(self):
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return
+
+        throughput = self._window_bytes / elapsed
+        latency = statistics.median(self._window_latencies) if self._window_latencies else None
+        if latency is not None and (self._base_latency is None or latency < self._base_latency):
+            self._base_latency = latency
+
+        if throughput > self.peak_throughput:
+            self.peak_throughput = throughput
+            self.peak_limit = self.limit
+
+        latency_spike = (
+            latency is not None and self._base_latency
+            and latency > 2 * self._base_latency
+        )
+        if self._window_errors or latency_spike:
+            self.limit = max(self.minimum, int(self.limit * self.decrease_factor))
+        elif self._saturated and throughput >= 0.95 * self._last_throughput:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._wake()
+
+        self._last_throughput = throughput
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_latencies = []
+        self._saturated = self._active >= self.limit
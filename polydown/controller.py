@@ -1,29 +1,151 @@
 import asyncio
+import contextlib
+import datetime
 import os
-import aiohttp
-from typing import List, Optional
-from rich.progress import (
-    Progress,
-    SpinnerColumn,
-    BarColumn,
-    TextColumn,
-    TimeRemainingColumn,
-    DownloadColumn,
-    TransferSpeedColumn,
-    TaskID
-)
-from rich.console import Console, Group
-from rich.live import Live
-from rich.panel import Panel
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from rich.console import Console
 
 from .api import PolyHavenClient
+from .budget import Rung, build_ladder, fit_to_budget
+from .cache import MetadataCache
+from .concurrency import AdaptiveLimiter
+from .destindex import DestinationIndex
+from .estimate import Estimate, load_throughput, probe_throughput, record_throughput
 from .downloader import DownloadManager, DownloadTask
+from .manifest import LibraryManifest
+from .metrics import RunMetrics
+from .multiproc import ProcessEngine
+from .progress import ProgressReporter, create_reporter
+from .retry import RetryPolicy
+from .scheduling import ScheduledQueue
+from .session import API_HOST, CDN_HOST, SessionPool
+from .sharding import shard_assets, shard_summary_path, shard_tasks, write_shard_summary
+from .store import BlobStore
+from .sync import Catalogue, SyncPlan, file_urls, plan_sync
+from .tasklist import FAILED_FILENAME, PlanCheckpoint, plan_record, write_task_list
+from .verify import VerifyReport, verify_library
 
 console = Console()
 
+# Bundle sections of a /files response; every other key is a texture map
+BUNDLE_KEYS = {'blend', 'gltf', 'mtlx', 'zip'}
+
+
+@dataclass
+class RunOutcome:
+    """Counters of one download run; worker processes send theirs back to be merged."""
+
+    results: Dict[str, int] = field(default_factory=lambda: {
+        "downloaded": 0, "linked": 0, "exists": 0, "failed": 0, "skipped": 0, "corrupted": 0, "retried": 0,
+    })
+    failed: List[dict] = field(default_factory=list)
+    discovered: int = 0
+    planned_bytes: int = 0
+    transferred_bytes: int = 0
+    # Seconds during which at least one file was being transferred
+    transfer_seconds: float = 0.0
+    started: float = field(default_factory=time.time)
+    # Download processes that failed or exited before reporting
+    crashed: int = 0
+    # Transfers in flight and the monotonic times the current busy and idle stretches began
+    _active: int = field(default=0, repr=False)
+    _busy_since: float = field(default=0.0, repr=False)
+    _idle_since: float = field(default=0.0, repr=False)
+
+    def transfer_started(self, requested_at: float):
+        """The first bytes of a file arrived; requested_at is when its download began."""
+        if not self._active:
+            self._busy_since = max(requested_at, self._idle_since)
+        self._active += 1
+
+    def transfer_finished(self):
+        self._active -= 1
+        if not self._active:
+            now = time.monotonic()
+            self.transfer_seconds += now - self._busy_since
+            self._idle_since = now
+
+    def count(self, status: str, verified: bool, error: Optional[BaseException] = None):
+        if status == "failed":
+            self.results["failed"] += 1
+        elif status == "exists":
+            self.results["exists"] += 1
+        elif status == "linked":
+            self.results["linked"] += 1
+        else:
+            self.results["downloaded"] += 1
+
+        if not verified and error is None:
+            self.results["corrupted"] += 1
+
+    def merge(self, other: "RunOutcome"):
+        """Add a worker process's results; discovery is counted where tasks are produced."""
+        for key, value in other.results.items():
+            self.results[key] = self.results.get(key, 0) + value
+        self.failed.extend(other.failed)
+        self.transferred_bytes += other.transferred_bytes
+        # Processes transfer side by side, so their busy time overlaps
+        self.transfer_seconds = max(self.transfer_seconds, other.transfer_seconds)
+
+# Coroutine factory that hands every discovered task to the given put() coroutine
+Producer = Callable[[Callable[[DownloadTask], Awaitable[None]]], Awaitable[None]]
+
 class PolydownController:
-    def __init__(self, concurrency: int = 4):
+    def __init__(
+        self,
+        concurrency: int = 4,
+        segments: int = 1,
+        segment_threshold: int = 64 * 1024 * 1024,
+        metadata_cache: Optional[MetadataCache] = None,
+        offline_metadata: bool = False,
+        use_manifest: bool = True,
+        adaptive: bool = False,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        metadata_concurrency: int = 10,
+        scheduling: str = "fifo",
+        sessions: Optional[SessionPool] = None,
+        progress: str = "rich",
+        chunk_size: int = 64 * 1024,
+        store: Optional[BlobStore] = None,
+        api_base_url: Optional[str] = None,
+        metrics: Optional[RunMetrics] = None,
+        retry: Optional[RetryPolicy] = None,
+        failed_output: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        shard_by: str = "assets",
+        processes: int = 1,
+        max_bytes: Optional[int] = None,
+        deep_verify: bool = False,
+    ):
         self.concurrency = concurrency
+        self.adaptive = adaptive
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.metadata_concurrency = metadata_concurrency
+        self.scheduling = scheduling
+        self.sessions = sessions
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self.store = store
+        self.api_base_url = api_base_url
+        self.metrics = metrics or RunMetrics()
+        self.retry = retry or RetryPolicy()
+        self.failed_output = failed_output
+        self.shard = shard
+        self.shard_by = shard_by
+        # Download processes, each with its own event loop; 1 keeps everything in this one
+        self.processes = processes
+        # With a byte budget every asset gets the largest size that still fits
+        self.max_bytes = max_bytes
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        self.metadata_cache = metadata_cache
+        self.offline_metadata = offline_metadata
+        self.use_manifest = use_manifest
+        self.deep_verify = deep_verify
 
     async def start(
         self,
@@ -38,152 +160,882 @@ class PolydownController:
         fileformat: Optional[str],
         texture_format: Optional[str] = None,
         maps: Optional[List[str]] = None,
+        sync: bool = False,
+        prune: bool = False,
     ):
-        async with aiohttp.ClientSession() as session:
-            client = PolyHavenClient(session)
-            downloader = DownloadManager(session, concurrency=self.concurrency)
+        async with self._session_scope() as session:
+            client = self._client(session)
 
             # 1. Fetch Assets
-            with console.status("[bold green]Fetching asset list...") as status:
+            with console.status("[bold green]Fetching asset list...") as status, self.metrics.phase("asset_list"):
                 assets = await client.get_assets(asset_type, category)
                 if iters:
                     assets = assets[:iters]
                 console.log(f"Found {len(assets)} assets.")
+                assets = self._shard_assets(assets)
 
             if not assets:
                 return
 
-            # 2. Process Assets & Build Tasks
-            tasks: List[DownloadTask] = []
-
-            # Limit metadata concurrency
-            sem = asyncio.Semaphore(10)
+            index = await self._scan_destination(folder)
+            manifest = LibraryManifest(folder) if self.use_manifest else None
+            downloader = self._create_downloader(session, manifest, index)
+            try:
+                # 2. Process Assets & Build Tasks
+                produce = self._shard_producer(self._metadata_producer(
+                    client, assets, asset_type, folder, sizes, overwrite,
+                    noimgs, tone, fileformat, texture_format, maps,
+                    prepare=downloader.prepare,
+                ))
+
+                if not sync:
+                    # 3. Execute Downloads while metadata is still being fetched
+                    await self._execute_downloads(downloader, produce, folder)
+                    return
+
+                # Sync needs the complete task list to print its plan up front
+                with console.status("[bold green]Fetching file metadata...") as status:
+                    tasks = await self._collect(produce)
+
+                if not tasks:
+                    console.print("[yellow]No files to download matching criteria.")
+                    return
+
+                catalogue = None
+                if prune:
+                    with console.status("[bold green]Fetching the full catalogue...") as status:
+                        catalogue = await self._fetch_catalogue(client, asset_type)
+                    if catalogue is None:
+                        console.print("[yellow]Not pruning: the catalogue could not be fetched completely.")
+
+                with console.status("[bold green]Comparing local files...") as status, self.metrics.phase("verify"):
+                    plan = await plan_sync(
+                        tasks, manifest, catalogue=catalogue, index=index, deep_verify=self.deep_verify,
+                    )
+                self._print_sync_plan(plan)
+                if plan.tasks:
+                    # 3. Execute Downloads
+                    await downloader.prepare(plan.tasks)
+                    await self._execute_downloads(downloader, self._produce_from(plan.tasks), folder)
+                else:
+                    console.print("[green]Library is up to date.")
+                # Only once the new files are in place
+                self._prune(plan, manifest)
+            finally:
+                downloader.close()
+                if manifest:
+                    manifest.close()
+
+    async def apply(self, tasks: List[DownloadTask], folder: str, checkpoint: Optional[PlanCheckpoint] = None):
+        """
+        Download an explicit task list (a saved plan or the failed tasks of an
+        earlier run) without the metadata API. Entries already in the
+        checkpoint are skipped and every completed entry is added to it; once
+        every entry is complete the checkpoint is removed.
+        """
+        planned = tasks
+        if checkpoint:
+            remaining = [task for task in tasks if task not in checkpoint]
+            if len(remaining) < len(tasks):
+                console.log(f"Skipping {len(tasks) - len(remaining)} entries completed by an earlier run.")
+            tasks = remaining
+
+        async with self._session_scope() as session:
+            index = await self._scan_destination(folder)
+            manifest = LibraryManifest(folder) if self.use_manifest else None
+            downloader = self._create_downloader(session, manifest, index)
+            try:
+                await downloader.prepare(tasks)
+                await self._execute_downloads(
+                    downloader, self._produce_from(tasks), folder,
+                    on_complete=checkpoint.mark if checkpoint else None,
+                )
+                if checkpoint and all(task in checkpoint for task in planned):
+                    checkpoint.remove()
+            finally:
+                downloader.close()
+                if manifest:
+                    manifest.close()
+
+    async def _scan_destination(self, folder: str) -> DestinationIndex:
+        """Index the files under folder in one pass off the event loop."""
+        loop = asyncio.get_running_loop()
+        with console.status("[bold green]Indexing local files...") as status, self.metrics.phase("index"):
+            index = await loop.run_in_executor(None, DestinationIndex.scan, folder)
+        if index.files:
+            console.log(f"Indexed {len(index.files)} local files.")
+        return index
+
+    def _create_downloader(
+        self,
+        session,
+        manifest: Optional[LibraryManifest],
+        index: Optional[DestinationIndex] = None,
+    ) -> DownloadManager:
+        limiter = None
+        if self.adaptive:
+            limiter = AdaptiveLimiter(
+                initial=self.concurrency,
+                minimum=self.min_concurrency,
+                maximum=self.max_concurrency,
+            )
+        return DownloadManager(
+            session,
+            concurrency=self.concurrency,
+            segments=self.segments,
+            segment_threshold=self.segment_threshold,
+            manifest=manifest,
+            limiter=limiter,
+            chunk_size=self.chunk_size,
+            store=self.store,
+            index=index,
+            deep_verify=self.deep_verify,
+        )
 
-            async def process_asset(asset_id):
-                async with sem:
+    def _metadata_producer(
+        self, client, assets, asset_type, folder, sizes, overwrite,
+        noimgs, tone, fileformat, texture_format, maps,
+        prepare: Optional[Callable[[List[DownloadTask]], Awaitable[None]]] = None,
+        on_asset: Optional[Callable[[str, List[DownloadTask]], None]] = None,
+    ) -> Producer:
+        """
+        Fetch /files for every asset and hand its tasks over as soon as they are parsed.
+        prepare receives each asset's tasks first, to create their folders in one batch;
+        on_asset sees them together with the asset ID.
+        A fixed pool of metadata_concurrency fetchers pulls asset IDs one at a
+        time, so when the download queue is full fetching pauses instead of
+        parsed tasks piling up: memory stays flat however large the catalogue.
+        With max_bytes set, every asset's size ladder is collected first and
+        the tasks of the chosen rungs are handed over once all are known.
+        """
+        async def produce(put: Callable[[DownloadTask], Awaitable[None]]):
+            pending = iter(assets)
+            ladders: Dict[str, List[Rung]] = {}
+
+            async def hand_over(asset_id: str, new_tasks: List[DownloadTask]):
+                if on_asset:
+                    on_asset(asset_id, new_tasks)
+                if prepare and new_tasks:
+                    try:
+                        await prepare(new_tasks)
+                    except OSError as e:
+                        # Each download retries the folder and reports its own failure
+                        console.log(f"[red]Error creating folders for {asset_id}: {e}")
+                for task in new_tasks:
+                    await put(task)
+
+            async def fetcher():
+                for asset_id in pending:
                     try:
                         files_data = await client.get_files(asset_id)
-                        new_tasks = self._generate_tasks(
+                        if self.max_bytes is not None:
+                            ladders[asset_id] = self._size_ladder(
+                                asset_type, asset_id, files_data, folder, sizes,
+                                overwrite, fileformat, texture_format, maps
+                            )
+                            continue
+                        new_tasks = list(self._generate_tasks(
                             asset_type, asset_id, files_data, folder, sizes,
                             overwrite, noimgs, tone, fileformat,
                             texture_format, maps
-                        )
-                        tasks.extend(new_tasks)
+                        ))
                     except Exception as e:
                         console.log(f"[red]Error fetching metadata for {asset_id}: {e}")
+                        continue
+                    # The raw /files JSON is not needed once parsed
+                    del files_data
+                    await hand_over(asset_id, new_tasks)
 
-            with console.status("[bold green]Fetching file metadata...") as status:
-                await asyncio.gather(*[process_asset(asset) for asset in assets])
-
-            console.log(f"Generated {len(tasks)} download tasks.")
+            # Overlaps the download phase when tasks are streamed to the workers
+            with self.metrics.phase("metadata"):
+                await asyncio.gather(*[fetcher() for _ in range(max(1, min(self.metadata_concurrency, len(assets))))])
 
-            if not tasks:
-                console.print("[yellow]No files to download matching criteria.")
+            if self.max_bytes is None:
                 return
+            # Catalogue order decides which assets are left out when even the smallest sizes do not fit
+            chosen = fit_to_budget({a: ladders[a] for a in assets if a in ladders}, self.max_bytes)
+            total = sum(rung.bytes for rung in chosen.values())
+            console.log(
+                f"Byte budget {self.max_bytes:,}: {len(chosen)} of {len(ladders)} assets fit, "
+                f"{total:,} bytes selected."
+            )
+            for asset_id, rung in chosen.items():
+                new_tasks = list(rung.tasks)
+                if not noimgs:
+                    new_tasks.extend(self._preview_tasks(asset_type, asset_id, folder, overwrite, tone))
+                await hand_over(asset_id, new_tasks)
+
+        return produce
+
+    def _size_ladder(
+        self, asset_type, asset_id, data, folder, sizes, overwrite, fileformat, texture_format, maps
+    ) -> List[Rung]:
+        """
+        Every size (and, where several formats are selected, every format) of
+        one asset as a separate rung, smallest first. -s limits the sizes considered.
+        """
+        available = []
+        for section in data.values():
+            if isinstance(section, dict):
+                available.extend(size for size in section if size not in available)
+        if sizes:
+            available = [size for size in available if size in sizes]
+
+        # Granular texture selection: every rung must hold at least one requested map
+        granular = asset_type != "hdris" and bool(texture_format or maps)
+        map_urls = set()
+        if granular:
+            for map_name in self._selected_maps(data, maps):
+                for size_data in data[map_name].values():
+                    if isinstance(size_data, dict):
+                        map_urls.update(
+                            info["url"] for info in size_data.values() if isinstance(info, dict) and "url" in info
+                        )
 
-            # 3. Execute Downloads
-            await self._execute_downloads(tasks, downloader)
+        if asset_type == "hdris":
+            formats = [fileformat] if fileformat else ["exr", "hdr"]
+        elif texture_format or not maps:
+            # A fixed texture format, or the Blender bundle, which has only one
+            formats = [texture_format]
+        else:
+            formats = sorted({
+                fmt for map_name in self._selected_maps(data, maps)
+                for size_data in data[map_name].values() if isinstance(size_data, dict)
+                for fmt, info in size_data.items() if isinstance(info, dict) and "url" in info
+            })
+
+        rungs = []
+        for size in available:
+            for fmt in formats:
+                tasks = list(self._generate_tasks(
+                    asset_type, asset_id, data, folder, [size], overwrite,
+                    True, False, fmt if asset_type == "hdris" else None,
+                    fmt if asset_type != "hdris" else None, maps
+                ))
+                if granular and not any(task.url in map_urls for task in tasks):
+                    # Only the .blend of that size, none of the requested maps
+                    continue
+                rungs.append(Rung(label=f"{size} {fmt}" if fmt and len(formats) > 1 else size, tasks=tasks))
+        return build_ladder(rungs)
+
+    def _preview_tasks(self, asset_type, asset_id, root_folder, overwrite, tone) -> Iterator[DownloadTask]:
+        # Same folders as the preview images of the regular generators
+        folder = root_folder if asset_type == "hdris" else os.path.join(root_folder, asset_id)
+        return self._get_image_tasks(asset_type, asset_id, folder, overwrite, tone)
+
+    async def _fetch_catalogue(self, client, asset_type: str) -> Optional[Catalogue]:
+        """
+        Every file URL of asset_type, ignoring all selection filters, for pruning.
+        None if any request failed: a missing asset must never look deleted.
+        """
+        catalogue = Catalogue()
+        try:
+            assets = await client.get_assets(asset_type)
+            for other in await client.get_asset_types():
+                if other != asset_type:
+                    catalogue.other_assets.update(await client.get_assets(other))
+        except Exception as e:
+            console.log(f"[red]Error fetching the asset list: {e}")
+            return None
+        catalogue.other_assets.difference_update(assets)
+
+        pending = iter(assets)
+        failed = False
+
+        async def fetcher():
+            nonlocal failed
+            for asset_id in pending:
+                if failed:
+                    return
+                try:
+                    files_data = await client.get_files(asset_id)
+                except Exception as e:
+                    console.log(f"[red]Error fetching metadata for {asset_id}: {e}")
+                    failed = True
+                    return
+                catalogue.urls.update(file_urls(files_data))
+                catalogue.urls.update(
+                    task.url for task in self._get_image_tasks(asset_type, asset_id, "", False, True)
+                )
 
+        await asyncio.gather(*[fetcher() for _ in range(max(1, min(self.metadata_concurrency, len(assets))))])
+        return None if failed else catalogue
 
-    async def _execute_downloads(self, tasks: List[DownloadTask], downloader: DownloadManager):
-        queue = asyncio.Queue()
-        for task in tasks:
-            queue.put_nowait(task)
+    def _shard_assets(self, assets: List[str]) -> List[str]:
+        if not self.shard or self.shard_by != "assets":
+            return assets
+        index, count = self.shard
+        selected = shard_assets(assets, index, count)
+        console.log(f"Shard {index}/{count}: {len(selected)} of {len(assets)} assets.")
+        return selected
 
-        results = {"downloaded": 0, "exists": 0, "failed": 0, "skipped": 0, "corrupted": 0}
+    def _shard_producer(self, produce: Producer) -> Producer:
+        """Byte-balanced sharding needs every shard to see the complete file list first."""
+        if not self.shard or self.shard_by != "bytes":
+            return produce
+        index, count = self.shard
 
-        # UI Setup
-        overall_progress = Progress(
-            TextColumn("[bold blue]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TextColumn("({task.completed}/{task.total})"),
-            TimeRemainingColumn(),
-        )
+        async def sharded(put: Callable[[DownloadTask], Awaitable[None]]):
+            tasks = await self._collect(produce)
+            selected = shard_tasks(tasks, index, count)
+            console.log(f"Shard {index}/{count}: {len(selected)} of {len(tasks)} files.")
+            for task in selected:
+                await put(task)
+
+        return sharded
+
+    @staticmethod
+    async def _collect(produce: Producer) -> List[DownloadTask]:
+        tasks: List[DownloadTask] = []
 
-        worker_progress = Progress(
-            TextColumn("[bold green]{task.description}"),
-            BarColumn(),
-            DownloadColumn(),
-            TransferSpeedColumn(),
+        async def collect(task: DownloadTask):
+            tasks.append(task)
+
+        await produce(collect)
+        return tasks
+
+    def _client(self, session) -> PolyHavenClient:
+        return PolyHavenClient(
+            session,
+            cache=self.metadata_cache,
+            offline=self.offline_metadata,
+            base_url=self.api_base_url,
+            retry=self.retry,
         )
 
-        progress_group = Group(
-            Panel(overall_progress, title="Overall Progress", border_style="blue"),
-            Panel(worker_progress, title="Worker Threads", border_style="green")
+    def create_session_pool(self) -> SessionPool:
+        """Per-host pools sized for this controller's metadata and download concurrency."""
+        download_slots = self.max_concurrency if self.adaptive else self.concurrency
+        return SessionPool(
+            host_limits={API_HOST: self.metadata_concurrency, CDN_HOST: 8},
+            default_limit=download_slots,
+            trace_configs=[self.metrics.trace_config()],
         )
 
-        overall_task_id = overall_progress.add_task("Total Files", total=len(tasks))
+    @contextlib.asynccontextmanager
+    async def _session_scope(self):
+        # A pool handed in by the caller is shared and stays open
+        if self.sessions:
+            yield self.sessions
+        else:
+            async with self.create_session_pool() as sessions:
+                yield sessions
+
+    @staticmethod
+    def _produce_from(tasks: List[DownloadTask]) -> Producer:
+        async def produce(put: Callable[[DownloadTask], Awaitable[None]]):
+            for task in tasks:
+                await put(task)
+        return produce
+
+    async def plan(
+        self,
+        asset_type: str,
+        category: Optional[str],
+        folder: str,
+        sizes: List[str],
+        overwrite: bool,
+        noimgs: bool,
+        iters: Optional[int],
+        tone: bool,
+        fileformat: Optional[str],
+        texture_format: Optional[str] = None,
+        maps: Optional[List[str]] = None,
+        on_asset: Optional[Callable[[str, List[DownloadTask]], None]] = None,
+    ) -> List[DownloadTask]:
+        """Resolve the complete task list from the API without downloading or touching the library."""
+        async with self._session_scope() as session:
+            client = self._client(session)
 
-        worker_task_ids = []
-        for i in range(self.concurrency):
-            tid = worker_progress.add_task(f"Worker {i+1}: Idle", visible=True, total=None)
-            worker_task_ids.append(tid)
+            with console.status("[bold green]Fetching asset list...") as status, self.metrics.phase("asset_list"):
+                assets = await client.get_assets(asset_type, category)
+                if iters:
+                    assets = assets[:iters]
+                console.log(f"Found {len(assets)} assets.")
+                assets = self._shard_assets(assets)
 
-        async def worker(worker_id: int, task_id: TaskID):
-            while True:
-                try:
-                    task = queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+            produce = self._shard_producer(self._metadata_producer(
+                client, assets, asset_type, folder, sizes, overwrite,
+                noimgs, tone, fileformat, texture_format, maps,
+                on_asset=on_asset,
+            ))
+            with console.status("[bold green]Fetching file metadata...") as status:
+                return await self._collect(produce)
 
-                # Colorize filename based on type
-                fname = task.filename
-                lower_name = fname.lower()
-                color = "white"
-                
-                if lower_name.endswith(".blend"):
-                    color = "bold cyan"
-                elif lower_name.endswith((".exr", ".hdr")):
-                    color = "bold yellow"
-                elif lower_name.endswith((".png", ".jpg", ".jpeg")):
-                    # Distinguish between previews/renders and actual texture maps
-                    if any(x in lower_name for x in ["thumb", "primary", "renders"]):
-                        color = "magenta"
-                    else:
-                        color = "green"
-
-                worker_progress.update(
-                    task_id, 
-                    description=f"Worker {worker_id+1}: [{color}]{fname}[/{color}]", 
-                    total=None, 
-                    completed=0, 
-                    visible=True
+    async def estimate(
+        self,
+        asset_type: str,
+        category: Optional[str],
+        folder: str,
+        sizes: List[str],
+        overwrite: bool,
+        noimgs: bool,
+        iters: Optional[int],
+        tone: bool,
+        fileformat: Optional[str],
+        texture_format: Optional[str] = None,
+        maps: Optional[List[str]] = None,
+        probe_seconds: float = 3.0,
+    ) -> Estimate:
+        """
+        Dry run: resolve the selection like a download would and report its
+        size, what the library already holds and how long the rest would take.
+        The ETA uses the throughput recorded by the last run into folder, or
+        a probe of probe_seconds against the largest files when there is none.
+        """
+        asset_of: Dict[str, str] = {}
+
+        def remember(asset_id: str, tasks: List[DownloadTask]):
+            for task in tasks:
+                asset_of[os.path.join(task.destination_folder, task.filename)] = asset_id
+
+        tasks = await self.plan(
+            asset_type, category, folder, sizes, overwrite, noimgs, iters, tone,
+            fileformat, texture_format, maps, on_asset=remember,
+        )
+        index = await self._scan_destination(folder)
+
+        estimate = Estimate()
+        for task in tasks:
+            path = os.path.join(task.destination_folder, task.filename)
+            stat = index.stat(path)
+            present = not overwrite and stat is not None and (task.size is None or stat[0] == task.size)
+            estimate.add(asset_type, asset_of.get(path, ""), task, present)
+
+        throughput, source = load_throughput(folder), "last run"
+        if throughput is None and probe_seconds > 0 and estimate.remaining_bytes:
+            async with self._session_scope() as session:
+                with console.status("[bold green]Measuring throughput...") as status:
+                    throughput = await probe_throughput(
+                        session, tasks, probe_seconds, connections=self._worker_count(), chunk_size=self.chunk_size,
+                    )
+            source = f"{probe_seconds:g}s probe"
+
+        self._print_estimate(estimate, throughput, source)
+        return estimate
+
+    async def verify(
+        self,
+        asset_type: str,
+        category: Optional[str],
+        folder: str,
+        sizes: List[str],
+        noimgs: bool,
+        iters: Optional[int],
+        tone: bool,
+        fileformat: Optional[str],
+        texture_format: Optional[str] = None,
+        maps: Optional[List[str]] = None,
+        processes: Optional[int] = None,
+    ) -> Optional[VerifyReport]:
+        """
+        Check a library against the /files metadata without downloading anything.
+        Unexpected files only count as extra if they belong to an asset of
+        asset_type and fall within the selected sizes and formats.
+        """
+        tasks = await self.plan(
+            asset_type, category, folder, sizes, False, noimgs, iters, tone,
+            fileformat, texture_format, maps
+        )
+        async with self._session_scope() as session:
+            assets = set(await self._client(session).get_assets(asset_type))
+
+        manifest = LibraryManifest(folder) if self.use_manifest else None
+        try:
+            with console.status(f"[bold green]Verifying {len(tasks)} files...") as status, self.metrics.phase("verify"):
+                report = await verify_library(
+                    tasks, folder, processes=processes, manifest=manifest,
+                    assets=assets, sizes=set(sizes) or None,
                 )
+        finally:
+            if manifest:
+                manifest.close()
+
+        self._print_verify_report(report, folder)
+        return report
+
+    def _print_verify_report(self, report: VerifyReport, folder: str):
+        def rel(path):
+            return os.path.relpath(path, folder)
+
+        console.print("\n[bold]Verify:[/bold]")
+        console.print(f"[green]OK: {len(report.ok)}")
+        for label, color, paths in [
+            ("Missing", "yellow", report.missing),
+            ("Corrupt (MD5 mismatch)", "bold red", report.corrupt),
+            ("Extra", "cyan", report.extra),
+        ]:
+            console.print(f"[{color}]{label}: {len(paths)}")
+            for path in paths:
+                console.print(f"  {rel(path)}")
+        for path, error in report.errors:
+            console.print(f"[red]Error reading {rel(path)}: {error}")
+        console.print(f"Hashed {report.bytes_hashed:,} bytes.")
+
+    def _print_estimate(self, estimate: Estimate, throughput: Optional[float], source: str):
+        console.print("\n[bold]Dry run:[/bold]")
+        for name, tallies in estimate.breakdown.items():
+            console.print(f"[bold]By {name}:")
+            for key, tally in sorted(tallies.items(), key=lambda item: -item[1].bytes):
+                console.print(f"  {key:<16} {tally.files:>8} files {tally.bytes:>20,} bytes")
+        console.print(f"Total: {estimate.total.files} files, {estimate.total.bytes:,} bytes")
+        if estimate.unknown_size:
+            console.print(f"[dim]{estimate.unknown_size} files have no size in the metadata (preview images).")
+        console.print(f"[yellow]Already present: {estimate.present.files} files, {estimate.present.bytes:,} bytes")
+        console.print(
+            f"[green]To transfer: {estimate.total.files - estimate.present.files} files, "
+            f"{estimate.remaining_bytes:,} bytes"
+        )
+        eta = estimate.eta(throughput)
+        if eta is None:
+            console.print("[dim]No throughput measurement available for an ETA.")
+        else:
+            console.print(
+                f"[bold]ETA: {datetime.timedelta(seconds=round(eta))} "
+                f"at {throughput / 1e6:.1f} MB/s ({source})"
+            )
+
+    def _print_sync_plan(self, plan: SyncPlan):
+        console.print("\n[bold]Sync plan:[/bold]")
+        console.print(f"[green]New: {len(plan.new)} files, {plan.new_bytes:,} bytes")
+        console.print(f"[yellow]Changed: {len(plan.changed)} files, {plan.changed_bytes:,} bytes")
+        console.print(f"Unchanged: {len(plan.unchanged)} files")
+        if plan.unknown_size:
+            console.print(f"[dim]{plan.unknown_size} queued files have no size in the metadata (preview images).")
+        if plan.prune:
+            console.print(f"[red]Prune: {len(plan.prune)} files, {plan.prune_bytes:,} bytes")
+        console.print(
+            f"[bold]Total transfer: {plan.new_bytes + plan.changed_bytes:,} bytes\n"
+        )
 
-                def progress_cb(chunk_size, total_size):
-                    worker_progress.update(task_id, total=total_size, advance=chunk_size)
+    def _prune(self, plan: SyncPlan, manifest: Optional[LibraryManifest]):
+        for path in plan.prune:
+            try:
+                os.remove(path)
+                if manifest:
+                    manifest.forget(path)
+                console.log(f"[red]Pruned {path}")
+            except OSError as e:
+                console.log(f"[red]Error pruning {path}: {e}")
 
-                filename, status, verified = await downloader.download(task, progress_cb)
 
+    async def _execute_downloads(
+        self,
+        downloader: DownloadManager,
+        produce: Producer,
+        folder: str,
+        on_complete: Optional[Callable[[DownloadTask], None]] = None,
+    ):
+        """
+        Download everything produce() discovers, then report.
+        With more than one engine process the transfers run in worker
+        processes and this process only produces tasks and shows progress.
+        """
+        if self.processes > 1:
+            engine = ProcessEngine(self.processes, self._worker_count())
+            reporter = create_reporter(self.progress, engine.worker_count, console)
+            with reporter, self.metrics.phase("download"):
+                outcome = await self._run_processes(engine, produce, folder, downloader.index, reporter, on_complete)
+            self._finish_run(outcome, folder, reporter)
+            return
+
+        worker_count = self._worker_count()
+        reporter = create_reporter(self.progress, worker_count, console)
+        with reporter, self.metrics.phase("download"):
+            outcome = await self._run_workers(downloader, produce, folder, worker_count, reporter, on_complete)
+        self._finish_run(outcome, folder, reporter, downloader.limiter)
+
+    def _worker_count(self) -> int:
+        # With an adaptive limiter there is one worker per possible slot
+        return self.max_concurrency if self.adaptive else self.concurrency
+
+    async def _run_workers(
+        self,
+        downloader: DownloadManager,
+        produce: Producer,
+        folder: str,
+        worker_count: int,
+        reporter: ProgressReporter,
+        on_complete: Optional[Callable[[DownloadTask], None]] = None,
+    ) -> RunOutcome:
+        """
+        Run download workers while produce() discovers tasks.
+        Tasks pass through a bounded queue and the overall total grows as they arrive.
+        A failed task goes back into the queue after a backoff delay until the
+        retry policy gives up on it; those end up in the failed task list.
+        on_complete is called for every task that ends up on disk.
+        """
+        # Size-ordered policies need to see every discovered task to order them,
+        # so only FIFO applies backpressure to the metadata fetchers
+        maxsize = worker_count * 4 if self.scheduling == "fifo" else 0
+        queue = ScheduledQueue(self.scheduling, maxsize=maxsize)
+        outcome = RunOutcome()
+        results = outcome.results
+        attempts: Dict[int, int] = {}
+        requeues = set()
+
+        async def put(task: DownloadTask):
+            await queue.put(task)
+            outcome.discovered += 1
+            outcome.planned_bytes += task.size or 0
+            reporter.discovered(outcome.discovered)
+
+        async def requeue(task: DownloadTask, delay: float):
+            await asyncio.sleep(delay)
+            await queue.put(task)
+            # Only now is the failed attempt done, so join() keeps waiting meanwhile
+            queue.task_done()
+
+        async def producer():
+            try:
+                await produce(put)
+            finally:
+                reporter.discovered(outcome.discovered, done=True)
+                # Re-queued tasks can arrive after discovery has finished
+                await queue.join()
+                # One sentinel per worker ends the run
+                for _ in range(worker_count):
+                    await queue.put(None)
+
+        async def worker(worker_id: int):
+            transferred = 0
+            started = 0.0
+            receiving = False
+
+            def progress_cb(chunk_size, total_size):
+                nonlocal transferred, receiving
+                if not receiving:
+                    receiving = True
+                    outcome.transfer_started(started)
+                transferred += chunk_size
+                reporter.advance(worker_id, chunk_size, total_size)
+
+            while True:
+                task = await queue.get()
+                if task is None:
+                    queue.task_done()
+                    break
+
+                reporter.file_started(worker_id, task)
+                transferred = 0
+                started = time.monotonic()
+                try:
+                    filename, status, verified = await downloader.download(task, progress_cb)
+                finally:
+                    if receiving:
+                        receiving = False
+                        outcome.transfer_finished()
+                # A resumed prefix is reported for the progress bars but arrived in an earlier run
+                transferred -= downloader.take_resumed(task)
+                attempt = attempts.pop(id(task), 0) + 1
+
+                error = downloader.take_error(task) if status == "failed" else None
                 if status == "failed":
-                    results["failed"] += 1
-                elif status == "exists":
-                    results["exists"] += 1
-                else:
-                    results["downloaded"] += 1
+                    # No exception means the MD5 or size did not match, worth another try
+                    if attempt < self.retry.attempts and (error is None or self.retry.is_retryable(error)):
+                        attempts[id(task)] = attempt
+                        results["retried"] += 1
+                        delay = self.retry.delay(attempt, error)
+                        reporter.file_retrying(worker_id, task, attempt, delay)
+                        retry_task = asyncio.create_task(requeue(task, delay))
+                        requeues.add(retry_task)
+                        retry_task.add_done_callback(requeues.discard)
+                        continue
+                    outcome.failed.append(plan_record(
+                        task, folder, attempts=attempt, error=str(error) if error else "MD5 or size mismatch"
+                    ))
+                elif on_complete and verified:
+                    on_complete(task)
 
-                if not verified:
-                    results["corrupted"] += 1
+                self.metrics.record_file(
+                    task.filename, task.url, status, transferred, time.monotonic() - started,
+                    retries=attempt - 1,
+                )
+                outcome.transferred_bytes += transferred
+                outcome.count(status, verified, error)
 
-                overall_progress.advance(overall_task_id)
-                worker_progress.update(task_id, description=f"Worker {worker_id+1}: Idle", visible=True)
+                reporter.file_finished(worker_id, task, status, verified)
                 queue.task_done()
 
-        with Live(progress_group, console=console, refresh_per_second=10):
-            workers = [
-                asyncio.create_task(worker(i, worker_task_ids[i]))
-                for i in range(self.concurrency)
-            ]
-            await asyncio.gather(*workers)
+        workers = [
+            asyncio.create_task(worker(i))
+            for i in range(worker_count)
+        ]
+        await asyncio.gather(producer(), *workers)
+        return outcome
+
+    async def _run_processes(
+        self,
+        engine: ProcessEngine,
+        produce: Producer,
+        folder: str,
+        index: Optional[DestinationIndex],
+        reporter: ProgressReporter,
+        on_complete: Optional[Callable[[DownloadTask], None]] = None,
+    ) -> RunOutcome:
+        """
+        Produce tasks here and download them in the engine's worker processes.
+        The scheduling policy orders tasks before they reach the shared queue;
+        retries happen inside the process that first picked a task up.
+        Progress events are replayed into this process's reporter and the
+        processes' outcomes and metrics are merged into one.
+        """
+        maxsize = engine.worker_count * 4 if self.scheduling == "fifo" else 0
+        queue = ScheduledQueue(self.scheduling, maxsize=maxsize)
+        outcome = RunOutcome()
+        # Submitted tasks without a final result, by destination path
+        outstanding: Dict[str, DownloadTask] = {}
+
+        def key(task: DownloadTask) -> str:
+            return os.path.join(task.destination_folder, task.filename)
+
+        async def put(task: DownloadTask):
+            await queue.put(task)
+            outcome.discovered += 1
+            outcome.planned_bytes += task.size or 0
+            reporter.discovered(outcome.discovered)
+
+        async def producer():
+            try:
+                await produce(put)
+            finally:
+                reporter.discovered(outcome.discovered, done=True)
+                await queue.put(None)
+
+        async def feeder():
+            accepting = True
+            while True:
+                task = await queue.get()
+                if task is None:
+                    break
+                outstanding[key(task)] = task
+                if not accepting:
+                    # Keep draining so the producer never blocks on a full queue
+                    continue
+                try:
+                    await engine.submit(task)
+                except RuntimeError as e:
+                    console.log(f"[red]{e}")
+                    accepting = False
+            if accepting:
+                try:
+                    await engine.finish()
+                except RuntimeError:
+                    pass
+
+        async def collect():
+            async for event in engine.iter_events():
+                kind = event[0]
+                if kind == "start":
+                    reporter.file_started(event[1], event[2])
+                elif kind == "advance":
+                    reporter.advance(event[1], event[2], event[3])
+                elif kind == "retry":
+                    reporter.file_retrying(*event[1:])
+                elif kind == "finish":
+                    _, worker_id, task, status, verified = event
+                    outstanding.pop(key(task), None)
+                    if on_complete and status != "failed" and verified:
+                        on_complete(task)
+                    reporter.file_finished(worker_id, task, status, verified)
+                elif kind == "error":
+                    outcome.crashed += 1
+                    console.log(f"[red]Download process {event[1] + 1} failed: {event[2]}")
+                elif kind == "died":
+                    outcome.crashed += 1
+                    console.log(f"[red]Download process {event[1] + 1} exited with code {event[2]}")
+                elif kind == "done" and event[2] is not None:
+                    outcome.merge(event[2])
+                    self.metrics.merge(event[3])
+
+        engine.start(self._process_options(), folder, index)
+        try:
+            await asyncio.gather(producer(), feeder(), collect())
+        finally:
+            engine.close()
+
+        # Taken from the queue by a process that never finished them, or never handed out
+        for task in outstanding.values():
+            outcome.failed.append(plan_record(task, folder, attempts=0, error="Download process exited"))
+            outcome.results["failed"] += 1
+        return outcome
+
+    def _process_options(self) -> dict:
+        """Controller settings a worker process needs to rebuild its own download side."""
+        return {
+            "concurrency": self.concurrency,
+            "segments": self.segments,
+            "segment_threshold": self.segment_threshold,
+            "use_manifest": self.use_manifest,
+            "deep_verify": self.deep_verify,
+            "metrics": RunMetrics(per_file=self.metrics.per_file),
+            "adaptive": self.adaptive,
+            "min_concurrency": self.min_concurrency,
+            "max_concurrency": self.max_concurrency,
+            "chunk_size": self.chunk_size,
+            "store": self.store,
+            "retry": self.retry,
+        }
+
+    def _finish_run(
+        self,
+        outcome: RunOutcome,
+        folder: str,
+        reporter: ProgressReporter,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        """Write the failed task list and shard summary, then print the summary."""
+        results = outcome.results
+        failed = outcome.failed
+        discovered = outcome.discovered
+        reporter.summary(results)
+
+        if outcome.transferred_bytes:
+            # Dry runs base their ETA on this
+            record_throughput(folder, outcome.transferred_bytes, outcome.transfer_seconds)
+
+        failed_path = self.failed_output or os.path.join(folder, FAILED_FILENAME)
+        if failed:
+            write_task_list(failed_path, failed)
+        elif os.path.exists(failed_path) and not outcome.crashed:
+            # A clean run leaves no stale list behind
+            os.remove(failed_path)
+
+        if self.shard:
+            index, count = self.shard
+            write_shard_summary(
+                shard_summary_path(folder, index, count), index, count, self.shard_by, results,
+                tasks=discovered, planned_bytes=outcome.planned_bytes,
+                transferred_bytes=outcome.transferred_bytes,
+                started=outcome.started, failed_output=failed_path if failed else None,
+            )
+
+        console.log(f"Generated {discovered} download tasks.")
+        if not discovered:
+            console.print("[yellow]No files to download matching criteria.")
+            return
 
         # 4. Report
         console.print("\n[bold]Summary:[/bold]")
         console.print(f"[green]Downloaded: {results['downloaded']}")
+        if results['linked'] > 0:
+            console.print(f"[green]Linked from store: {results['linked']}")
         console.print(f"[yellow]Existing: {results['exists']}")
+        if results['retried'] > 0:
+            console.print(f"[cyan]Retried: {results['retried']}")
         console.print(f"[red]Failed: {results['failed']}")
+        if failed:
+            console.print(f"[red]Failed tasks written to {failed_path}; rerun them with 'polydown apply {failed_path} -f {folder}'.")
         if results['corrupted'] > 0:
             console.print(f"[bold red]Corrupted (MD5 mismatch): {results['corrupted']}")
+        if outcome.crashed:
+            console.print(f"[bold red]Download processes that exited early: {outcome.crashed}")
+        if limiter:
+            console.print(
+                f"[cyan]Adaptive concurrency settled at {limiter.limit} "
+                f"(range {limiter.minimum}-{limiter.maximum}, "
+                f"peak {limiter.peak_throughput / 1e6:.1f} MB/s at {limiter.peak_limit})"
+            )
 
 
     def _generate_tasks(
@@ -199,73 +1051,33 @@ class PolydownController:
         fileformat: Optional[str],
         texture_format: Optional[str] = None,
         maps: Optional[List[str]] = None,
-    ) -> List[DownloadTask]:
-        tasks = []
-
+    ) -> Iterator[DownloadTask]:
+        """Yield the tasks of one asset lazily; nothing is kept once a task is consumed."""
         if asset_type == "hdris":
-            tasks.extend(self._generate_hdri_tasks(
+            yield from self._generate_hdri_tasks(
                 asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, fileformat
-            ))
+            )
         elif asset_type in ["textures", "models"]:
-            tasks.extend(self._generate_texture_tasks(
+            yield from self._generate_texture_tasks(
                 asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, texture_format, maps, asset_type
-            ))
-
-        return tasks
-
-    def _generate_hdri_tasks(self, asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, fileformat):
-        tasks = []
-        available_sizes = data.get('hdri', {})
-
-        for size, size_data in available_sizes.items():
-            if target_sizes and size not in target_sizes:
-                continue
-
-            formats_to_check = [fileformat] if fileformat else ['exr', 'hdr']
-
-            for fmt in formats_to_check:
-                if fmt in size_data:
-                    file_info = size_data[fmt]
-                    url = file_info['url']
-                    md5 = file_info.get('md5')
-                    filename = url.split('/')[-1]
-
-                    tasks.append(DownloadTask(
-                        url=url,
-                        destination_folder=root_folder,
-                        filename=filename,
-                        md5=md5,
-                        overwrite=overwrite
-                    ))
-
-        if not noimgs:
-            tasks.extend(self._get_image_tasks("hdris", asset_id, root_folder, overwrite, tone))
-        return tasks
+            )
 
     def _generate_texture_tasks(self, asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, texture_format, maps, asset_type="textures"):
-        tasks = []
-        
         # If no specific texture args are provided, fallback to default behavior (downloading Blender/GLTF bundle)
         if not texture_format and not maps:
-            return self._generate_model_tasks(asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, asset_type=asset_type)
+            yield from self._generate_model_tasks(asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, asset_type=asset_type)
+            return
 
         # Logic for Granular Textures
         # Always attempt to download the blend file (but without its default texture dependencies)
         # This covers both 'models' and 'textures' which may have blend files.
-        tasks.extend(self._generate_model_tasks(
+        yield from self._generate_model_tasks(
             asset_id, data, root_folder, target_sizes, overwrite, 
             noimgs=True, tone=tone, asset_type=asset_type,
             include_model_textures=False
-        ))
+        )
 
-        # Filter out non-map keys
-        ignored_keys = {'blend', 'gltf', 'mtlx', 'zip'}
-        available_maps = [k for k in data.keys() if k not in ignored_keys]
-
-        # Case-insensitive map filtering
-        if maps:
-            wanted_maps_lower = [m.lower() for m in maps]
-            available_maps = [m for m in available_maps if m.lower() in wanted_maps_lower]
+        available_maps = self._selected_maps(data, maps)
 
         for map_name in available_maps:
             if map_name not in data:
@@ -299,74 +1111,29 @@ class PolydownController:
                         # Store in a subfolder structure: asset_id/size/textures to match standard behavior
                         dest_folder = os.path.join(root_folder, asset_id, f"{asset_id}_{size}", "textures")
                         
-                        tasks.append(DownloadTask(
+                        yield DownloadTask(
                             url=url,
                             destination_folder=dest_folder,
                             filename=filename,
                             md5=md5,
-                            overwrite=overwrite
-                        ))
-
-        if not noimgs:
-            image_folder = os.path.join(root_folder, asset_id)
-            tasks.extend(self._get_image_tasks(asset_type, asset_id, image_folder, overwrite, tone))
-            
-        return tasks
-
-    def _generate_model_tasks(self, asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone):
-        tasks = []
-        # Support both 'blend' and 'gltf' if ever needed, but defaulting to blend for now as per original code
-        # Original code only checked 'blend' key
-        blend_data = data.get('blend', {})
-        for size, content in blend_data.items():
-            if target_sizes and size not in target_sizes:
-                continue
-
-            # Subfolder logic
-            asset_folder = os.path.join(root_folder, asset_id)
-            # Original PolyDown saves to: root/asset_id/asset_id_size/
-            size_folder = os.path.join(asset_folder, f"{asset_id}_{size}")
-            textures_folder = os.path.join(size_folder, "textures")
-
-            # Blend file
-            if 'blend' in content:
-                b_info = content.get('blend', {})
-                if b_info:
-                    url = b_info['url']
-                    md5 = b_info.get('md5')
-                    filename = url.split('/')[-1]
-
-                    tasks.append(DownloadTask(
-                        url=url,
-                        destination_folder=size_folder,
-                        filename=filename,
-                        md5=md5,
-                        overwrite=overwrite
-                    ))
-
-                    # Includes (textures associated with the blend file)
-                    includes = b_info.get('include', {})
-                    for tex_key, tex_info in includes.items():
-                        t_url = tex_info['url']
-                        t_md5 = tex_info.get('md5')
-                        t_filename = t_url.split('/')[-1]
-
-                        tasks.append(DownloadTask(
-                            url=t_url,
-                            destination_folder=textures_folder,
-                            filename=t_filename,
-                            md5=t_md5,
-                            overwrite=overwrite
-                        ))
+                            overwrite=overwrite,
+                            size=file_info.get('size')
+                        )
 
         if not noimgs:
             image_folder = os.path.join(root_folder, asset_id)
-            tasks.extend(self._get_image_tasks(asset_type, asset_id, image_folder, overwrite, tone))
+            yield from self._get_image_tasks(asset_type, asset_id, image_folder, overwrite, tone)
 
-        return tasks
+    @staticmethod
+    def _selected_maps(data: dict, maps: Optional[List[str]]) -> List[str]:
+        """Texture map sections of a /files response, filtered case-insensitively by maps."""
+        available_maps = [k for k in data.keys() if k not in BUNDLE_KEYS]
+        if maps:
+            wanted_maps_lower = [m.lower() for m in maps]
+            available_maps = [m for m in available_maps if m.lower() in wanted_maps_lower]
+        return available_maps
 
     def _generate_hdri_tasks(self, asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, fileformat):
-        tasks = []
         available_sizes = data.get('hdri', {})
 
         for size, size_data in available_sizes.items():
@@ -382,21 +1149,20 @@ class PolydownController:
                     md5 = file_info.get('md5')
                     filename = url.split('/')[-1]
 
-                    tasks.append(DownloadTask(
+                    yield DownloadTask(
                         url=url,
                         destination_folder=root_folder,
                         filename=filename,
                         md5=md5,
-                        overwrite=overwrite
-                    ))
+                        overwrite=overwrite,
+                        size=file_info.get('size')
+                    )
 
         if not noimgs:
-            tasks.extend(self._get_image_tasks("hdris", asset_id, root_folder, overwrite, tone))
-        return tasks
+            yield from self._get_image_tasks("hdris", asset_id, root_folder, overwrite, tone)
 
 
     def _generate_model_tasks(self, asset_id, data, root_folder, target_sizes, overwrite, noimgs, tone, asset_type="models", include_model_textures=True):
-        tasks = []
         blend_data = data.get('blend', {})
         for size, content in blend_data.items():
             if target_sizes and size not in target_sizes:
@@ -416,13 +1182,14 @@ class PolydownController:
                     md5 = b_info.get('md5')
                     filename = url.split('/')[-1]
 
-                    tasks.append(DownloadTask(
+                    yield DownloadTask(
                         url=url,
                         destination_folder=size_folder,
                         filename=filename,
                         md5=md5,
-                        overwrite=overwrite
-                    ))
+                        overwrite=overwrite,
+                        size=b_info.get('size')
+                    )
 
                     # Includes (textures associated with the blend file)
                     if include_model_textures:
@@ -432,22 +1199,20 @@ class PolydownController:
                             t_md5 = tex_info.get('md5')
                             t_filename = t_url.split('/')[-1]
 
-                            tasks.append(DownloadTask(
+                            yield DownloadTask(
                                 url=t_url,
                                 destination_folder=textures_folder,
                                 filename=t_filename,
                                 md5=t_md5,
-                                overwrite=overwrite
-                            ))
+                                overwrite=overwrite,
+                                size=tex_info.get('size')
+                            )
         
         if not noimgs:
             image_folder = os.path.join(root_folder, asset_id)
-            tasks.extend(self._get_image_tasks(asset_type, asset_id, image_folder, overwrite, tone))
-            
-        return tasks
+            yield from self._get_image_tasks(asset_type, asset_id, image_folder, overwrite, tone)
 
     def _get_image_tasks(self, asset_type, asset_id, folder, overwrite, tone):
-        tasks = []
         imgs_dict = {}
         if asset_type == "hdris":
             imgs_dict = {
@@ -478,11 +1243,10 @@ class PolydownController:
             ext = url.split('.')[-1]
             filename = f"{asset_id}_{key}.{ext}"
 
-            tasks.append(DownloadTask(
+            yield DownloadTask(
                 url=url,
                 destination_folder=folder,
                 filename=filename,
                 md5=None,
                 overwrite=overwrite
-            ))
-        return tasks
+            )
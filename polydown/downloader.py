@@ -1,24 +1,68 @@
 import asyncio
 import hashlib
 import os
+import time
 import aiohttp
 from dataclasses import dataclass
-from typing import Optional, Tuple, Literal, Callable
+from typing import Dict, Iterable, Optional, Tuple, Literal, Callable
 
-@dataclass
+from .concurrency import AdaptiveLimiter
+from .destindex import DestinationIndex
+from .manifest import LibraryManifest
+from .store import BlobStore
+from .writer import DiskWriter
+
+# Slotted: a full-catalogue run creates one of these per file
+@dataclass(slots=True)
 class DownloadTask:
     url: str
     destination_folder: str
     filename: str
     md5: Optional[str] = None
     overwrite: bool = False
+    size: Optional[int] = None
+
+class RangeNotSupported(Exception):
+    """A segment request was answered with the whole file instead of its range."""
 
-DownloadStatus = Literal["downloaded", "downloaded_ow", "skipped", "failed", "exists"]
+
+DownloadStatus = Literal["downloaded", "downloaded_ow", "linked", "skipped", "failed", "exists"]
 
 class DownloadManager:
-    def __init__(self, session: aiohttp.ClientSession, concurrency: int = 4):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        concurrency: int = 4,
+        segments: int = 1,
+        segment_threshold: int = 64 * 1024 * 1024,
+        manifest: Optional[LibraryManifest] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        writer: Optional[DiskWriter] = None,
+        chunk_size: int = 64 * 1024,
+        store: Optional[BlobStore] = None,
+        index: Optional[DestinationIndex] = None,
+        deep_verify: bool = False,
+    ):
         self.session = session
-        self.semaphore = asyncio.Semaphore(concurrency)
+        # Rehash existing files even when the manifest vouches for them, and refresh their rows
+        self.deep_verify = deep_verify
+        # Existence checks come from the pre-scanned index when there is one
+        self.index = index
+        self.store = store
+        # All blocking filesystem calls go through the writer's thread pool
+        self._own_writer = writer is None
+        self.writer = writer or DiskWriter()
+        self.chunk_size = chunk_size
+        self.manifest = manifest
+        self.limiter = limiter
+        # An adaptive limiter replaces the fixed semaphore when given
+        self.semaphore = limiter or asyncio.Semaphore(concurrency)
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        # Why the last attempt for a path failed, kept for the retry decision
+        self.errors: Dict[str, BaseException] = {}
+        # Bytes of a path that the last attempt resumed from its .part rather than received
+        self.resumed: Dict[str, int] = {}
 
     async def verify_md5(self, filepath: str, expected_md5: str) -> bool:
         if not expected_md5:
@@ -32,11 +76,195 @@ class DownloadManager:
         if not os.path.exists(filepath):
             return False
 
+        return DownloadManager._md5_of_file_sync(filepath).hexdigest() == expected_md5
+
+    @staticmethod
+    def _md5_of_file_sync(filepath: str) -> "hashlib._Hash":
         hasher = hashlib.md5()
         with open(filepath, "rb") as f:
             while chunk := f.read(8192):
                 hasher.update(chunk)
-        return hasher.hexdigest() == expected_md5
+        return hasher
+
+    async def prepare(self, tasks: Iterable[DownloadTask]):
+        """Create the destination folders of tasks, all in one executor call."""
+        folders = {task.destination_folder for task in tasks}
+        if self.index:
+            missing = self.index.missing_dirs(folders)
+            if missing:
+                await self.writer.run(self.index.make_dirs, missing)
+        elif folders:
+            await self.writer.run(self._make_dirs, folders)
+
+    async def _exists(self, path: str) -> bool:
+        if self.index:
+            return self.index.exists(path)
+        return await self.writer.run(os.path.exists, path)
+
+    async def _written(self, filepath: str):
+        if self.index:
+            await self.writer.run(self.index.add, filepath)
+
+    def take_error(self, task: DownloadTask) -> Optional[BaseException]:
+        """Pop the exception behind the last "failed" result for task, if there was one."""
+        return self.errors.pop(os.path.join(task.destination_folder, task.filename), None)
+
+    def take_resumed(self, task: DownloadTask) -> int:
+        """Pop how many of the bytes reported for task's last attempt came from an earlier run."""
+        return self.resumed.pop(os.path.join(task.destination_folder, task.filename), 0)
+
+    def close(self):
+        if self._own_writer:
+            self.writer.shutdown()
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _write_validator(validator_path: str, validator: str) -> None:
+        with open(validator_path, "w") as f:
+            f.write(validator)
+
+    @staticmethod
+    def _finalize(part_path: str, filepath: str, validator_path: str) -> None:
+        os.replace(part_path, filepath)
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+
+    @staticmethod
+    def _read_validator(validator_path: str) -> Optional[str]:
+        try:
+            with open(validator_path, "r") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    @staticmethod
+    def _make_dirs(folders: Iterable[str]) -> None:
+        for folder in folders:
+            os.makedirs(folder, exist_ok=True)
+
+    @staticmethod
+    def _discard_partial(part_path: str, validator_path: str) -> None:
+        for path in (part_path, validator_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def _download_single(
+        self,
+        task: DownloadTask,
+        part_path: str,
+        validator_path: str,
+        progress_callback: Optional[Callable[[int, int], None]],
+    ) -> Tuple[int, str]:
+        """
+        Stream the file into part_path, resuming it if possible.
+        The MD5 is updated chunk by chunk while streaming.
+        Returns: (expected_size, md5_hexdigest)
+        """
+        offset = await self.writer.run(self._file_size, part_path)
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            validator = self._read_validator(validator_path)
+            if validator:
+                headers["If-Range"] = validator
+
+        started = time.monotonic()
+        async with self.session.get(task.url, headers=headers or None) as response:
+            if self.limiter:
+                self.limiter.record_latency(time.monotonic() - started)
+            loop = asyncio.get_running_loop()
+            if response.status == 416:
+                # The partial file already holds every byte
+                hasher = await loop.run_in_executor(None, self._md5_of_file_sync, part_path)
+                return offset, hasher.hexdigest()
+
+            response.raise_for_status()
+            if response.status != 206:
+                # Server ignored the range or the file changed
+                offset = 0
+
+            if offset:
+                # Only the already downloaded prefix needs to be read back
+                hasher = await loop.run_in_executor(None, self._md5_of_file_sync, part_path)
+            else:
+                hasher = hashlib.md5()
+            total_size = offset + int(response.headers.get('content-length', 0))
+
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if validator:
+                await self.writer.run(self._write_validator, validator_path, validator)
+
+            if offset:
+                self.resumed[os.path.join(task.destination_folder, task.filename)] = offset
+                if progress_callback:
+                    progress_callback(offset, total_size)
+
+            # Not preallocated: the next attempt resumes from the .part's length,
+            # which must only ever cover bytes that were written, even after a kill
+            sink = await self.writer.open(part_path, offset=offset, truncate=not offset, trim=True)
+            async with sink:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    await sink.write(chunk)
+                    hasher.update(chunk)
+                    if self.limiter:
+                        self.limiter.record_bytes(len(chunk))
+                    if progress_callback:
+                        progress_callback(len(chunk), total_size)
+
+        return total_size, hasher.hexdigest()
+
+    async def _download_segmented(
+        self,
+        task: DownloadTask,
+        part_path: str,
+        total_size: int,
+        progress_callback: Optional[Callable[[int, int], None]],
+    ) -> int:
+        """Fetch total_size bytes as concurrent byte ranges into a preallocated part_path."""
+        await self.writer.preallocate(part_path, total_size)
+
+        segment_size = -(-total_size // self.segments)
+        ranges = [
+            (start, min(start + segment_size, total_size) - 1)
+            for start in range(0, total_size, segment_size)
+        ]
+
+        async def fetch(start: int, end: int):
+            # Every segment occupies one slot of the global worker semaphore
+            async with self.semaphore:
+                headers = {"Range": f"bytes={start}-{end}"}
+                started = time.monotonic()
+                async with self.session.get(task.url, headers=headers) as response:
+                    if self.limiter:
+                        self.limiter.record_latency(time.monotonic() - started)
+                    response.raise_for_status()
+                    if response.status != 206:
+                        raise RangeNotSupported(task.url)
+                    sink = await self.writer.open(part_path, offset=start, truncate=False)
+                    async with sink:
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            await sink.write(chunk)
+                            if self.limiter:
+                                self.limiter.record_bytes(len(chunk))
+                            if progress_callback:
+                                progress_callback(len(chunk), total_size)
+
+        jobs = [asyncio.create_task(fetch(start, end)) for start, end in ranges]
+        try:
+            await asyncio.gather(*jobs)
+        except BaseException:
+            # No segment may keep writing into a part file that is about to be discarded
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            raise
+        return total_size
 
     async def download(
         self,
@@ -45,36 +273,106 @@ class DownloadManager:
     ) -> Tuple[str, DownloadStatus, bool]:
         """
         Downloads a file.
+        Data is streamed into a ``.part`` sidecar which is resumed with a
+        Range request on the next attempt and only renamed to the final
+        name once its size and MD5 match. Files of at least
+        ``segment_threshold`` bytes, by their metadata size, are fetched as
+        ``segments`` concurrent byte ranges when segmentation is enabled, and
+        as one stream if the server does not honour ranges.
         Returns: (filename, status, md5_verified)
         """
         filepath = os.path.join(task.destination_folder, task.filename)
-        existed_before = os.path.exists(filepath)
+        part_path = filepath + ".part"
+        validator_path = part_path + ".validator"
+        existed_before = await self._exists(filepath)
 
         # Check if file exists and we should skip
         if existed_before and not task.overwrite:
+            # Files verified on an earlier run are trusted while size and mtime match
+            stat = self.index.stat(filepath) if self.index else None
+            if (
+                self.manifest and not self.deep_verify
+                and await self.writer.run(self.manifest.is_current, filepath, task.md5, stat)
+            ):
+                return task.filename, "exists", True
+
             # Validate existing file
             is_valid = await self.verify_md5(filepath, task.md5) if task.md5 else True
+            if is_valid and self.manifest:
+                await self.writer.run(self.manifest.record, filepath, task.url, task.md5)
             return task.filename, "exists", is_valid
 
-        # Download needed (either didn't exist, or overwrite is True)
-        async with self.semaphore:
+        # Content already in the store becomes a local link, no request needed
+        if self.store and task.md5 and await self.writer.run(self.store.has, task.md5):
             try:
-                os.makedirs(task.destination_folder, exist_ok=True)
-                async with self.session.get(task.url) as response:
-                    response.raise_for_status()
-                    total_size = int(response.headers.get('content-length', 0))
+                await self.writer.run(self.store.materialize, task.md5, filepath)
+                await self._written(filepath)
+                if self.manifest:
+                    await self.writer.run(self.manifest.record, filepath, task.url, task.md5)
+                return task.filename, "linked", True
+            except OSError:
+                # Fall through to a normal download
+                pass
 
-                    with open(filepath, "wb") as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                            if progress_callback:
-                                progress_callback(len(chunk), total_size)
+        # Download needed (either didn't exist, or overwrite is True)
+        try:
+            await self.prepare([task])
+
+            # Only sizes from the metadata are segmented: probing the others would
+            # cost a request per file, most of them small preview images
+            segmented = (
+                self.segments > 1
+                and task.size is not None
+                and task.size >= self.segment_threshold
+                and not await self.writer.run(os.path.exists, part_path)
+            )
 
-                # Verify
-                is_valid = await self.verify_md5(filepath, task.md5) if task.md5 else True
-                status = "downloaded_ow" if existed_before else "downloaded"
-                return task.filename, status, is_valid
+            if segmented:
+                try:
+                    total_size = await self._download_segmented(
+                        task, part_path, task.size, progress_callback
+                    )
+                except RangeNotSupported:
+                    # The server sent the whole file: fetch it as one stream instead
+                    await self.writer.run(self._discard_partial, part_path, validator_path)
+                    segmented = False
+                except Exception:
+                    # Segment progress is not tracked, so a preallocated part cannot be resumed
+                    await self.writer.run(self._discard_partial, part_path, validator_path)
+                    raise
 
-            except Exception as e:
-                # In a real app we might log this
+            if segmented:
+                # Ranges arrive out of order, so the MD5 is computed once assembled
+                is_valid = await self.verify_md5(part_path, task.md5) if task.md5 else True
+            else:
+                async with self.semaphore:
+                    total_size, digest = await self._download_single(
+                        task, part_path, validator_path, progress_callback
+                    )
+                is_valid = digest == task.md5 if task.md5 else True
+
+            # Verify before exposing the file under its final name
+            size_ok = not total_size or await self.writer.run(self._file_size, part_path) == total_size
+            is_valid = size_ok and is_valid
+            if not is_valid:
+                await self.writer.run(self._discard_partial, part_path, validator_path)
                 return task.filename, "failed", False
+
+            await self.writer.run(self._finalize, part_path, filepath, validator_path)
+            await self._written(filepath)
+            if self.store and task.md5:
+                await self.writer.run(self.store.add, filepath, task.md5)
+            if self.manifest:
+                await self.writer.run(self.manifest.record, filepath, task.url, task.md5)
+            status = "downloaded_ow" if existed_before else "downloaded"
+            return task.filename, status, True
+
+        except Exception as e:
+            if self.limiter:
+                if isinstance(e, aiohttp.ClientResponseError):
+                    self.limiter.record_error(e.status)
+                elif isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                    self.limiter.record_error()
+            self.errors[filepath] = e
+            # The .part file is kept so the next attempt can resume it
+            return task.filename, "failed", False
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from .downloader import DownloadTask
+
+# Throughput of the last download run into a library, for dry-run ETAs
+STATS_FILENAME = ".polydown-stats.json"
+
+BREAKDOWNS = ["type", "size", "format", "map"]
+
+
+@dataclass
+class Tally:
+    files: int = 0
+    bytes: int = 0
+
+    def add(self, nbytes: int):
+        self.files += 1
+        self.bytes += nbytes
+
+
+def classify(asset_id: str, task: DownloadTask) -> Tuple[str, str, str]:
+    """
+    (size, format, map) of a task, read from its Poly Haven file name:
+    <asset>_<size>.<ext> for HDRIs and Blender files, <asset>_<map>_<size>.<ext>
+    for texture maps. Preview images have neither an MD5 nor a size.
+    """
+    if task.md5 is None and task.size is None:
+        return "-", file_format(task.filename), "preview"
+    return classify_filename(asset_id, task.filename)
+
+
+def file_format(filename: str) -> str:
+    return os.path.splitext(filename)[1].lstrip(".").lower() or "-"
+
+
+def classify_filename(asset_id: str, filename: str) -> Tuple[str, str, str]:
+    """(size, format, map) of a file name alone, see classify."""
+    stem = os.path.splitext(filename)[0]
+    fmt = file_format(filename)
+    if not stem.startswith(f"{asset_id}_"):
+        # Not named after the asset, only a trailing size can be trusted
+        size = stem.rpartition("_")[2]
+        return (size if re.fullmatch(r"\d+k", size) else "-"), fmt, "-"
+    name, _, size = stem[len(asset_id) + 1:].rpartition("_")
+    if not re.fullmatch(r"\d+k", size):
+        name, size = stem[len(asset_id) + 1:], "-"
+    return size, fmt, name or "-"
+
+
+class Estimate:
+    """Files and bytes of a selection, broken down, with what the library already holds."""
+
+    def __init__(self):
+        self.total = Tally()
+        self.present = Tally()
+        self.unknown_size = 0
+        self.breakdown: Dict[str, Dict[str, Tally]] = {name: {} for name in BREAKDOWNS}
+
+    def add(self, asset_type: str, asset_id: str, task: DownloadTask, present: bool = False):
+        nbytes = task.size or 0
+        self.total.add(nbytes)
+        if task.size is None:
+            self.unknown_size += 1
+        if present:
+            self.present.add(nbytes)
+        size, fmt, map_name = classify(asset_id, task)
+        for name, key in zip(BREAKDOWNS, (asset_type, size, fmt, map_name)):
+            self.breakdown[name].setdefault(key, Tally()).add(nbytes)
+
+    @property
+    def remaining_bytes(self) -> int:
+        return self.total.bytes - self.present.bytes
+
+    def eta(self, throughput: Optional[float]) -> Optional[float]:
+        """Seconds to transfer what is not present yet, at throughput bytes/s."""
+        if not throughput:
+            return None
+        return self.remaining_bytes / throughput
+
+
+def record_throughput(folder: str, nbytes: int, seconds: float):
+    if not nbytes or seconds <= 0:
+        return
+    stats = {"bytes": nbytes, "seconds": seconds, "throughput": nbytes / seconds, "finished": time.time()}
+    path = os.path.join(folder, STATS_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_throughput(folder: str) -> Optional[float]:
+    """Bytes/s of the last download run into folder, if one was recorded."""
+    try:
+        with open(os.path.join(folder, STATS_FILENAME), "r", encoding="utf-8") as f:
+            return float(json.load(f)["throughput"]) or None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+async def probe_throughput(
+    session,
+    tasks: Iterable[DownloadTask],
+    seconds: float = 3.0,
+    connections: int = 4,
+    chunk_size: int = 64 * 1024,
+) -> Optional[float]:
+    """
+    Stream the largest files over connections parallel requests for a few
+    seconds and discard the data. Returns the aggregate bytes/s, or None if
+    nothing arrived.
+    """
+    candidates = sorted((t for t in tasks if t.size), key=lambda t: -t.size)[:connections]
+    if not candidates:
+        return None
+    received = 0
+
+    async def fetch(task: DownloadTask):
+        nonlocal received
+        async with session.get(task.url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                received += len(chunk)
+
+    started = time.monotonic()
+    jobs = [asyncio.create_task(fetch(task)) for task in candidates]
+    done, pending = await asyncio.wait(jobs, timeout=seconds)
+    for job in pending:
+        job.cancel()
+    # Failed probes only lower the measurement
+    await asyncio.gather(*jobs, return_exceptions=True)
+    elapsed = time.monotonic() - started
+    return received / elapsed if received and elapsed else None
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+MANIFEST_FILENAME = ".polydown.sqlite"
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    url: str
+    size: int
+    mtime_ns: int
+    md5: Optional[str]
+    verified_at: float
+
+
+class LibraryManifest:
+    """
+    SQLite record of verified files in a download root.
+    A file whose size and mtime still match its row is trusted without rehashing.
+    Safe to call from the download manager's writer threads.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.db_path = os.path.join(self.root, MANIFEST_FILENAME)
+        # Worker processes of the multi-process engine share the database
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                md5 TEXT,
+                verified_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def _key(self, filepath: str) -> str:
+        return os.path.relpath(os.path.abspath(filepath), self.root).replace(os.sep, "/")
+
+    def lookup(self, filepath: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT path, url, size, mtime_ns, md5, verified_at FROM files WHERE path = ?",
+                (self._key(filepath),),
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def entries(self) -> Iterator[ManifestEntry]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, url, size, mtime_ns, md5, verified_at FROM files ORDER BY path"
+            ).fetchall()
+        for row in rows:
+            yield ManifestEntry(*row)
+
+    def absolute_path(self, entry: ManifestEntry) -> str:
+        return os.path.join(self.root, *entry.path.split("/"))
+
+    def is_current(
+        self,
+        filepath: str,
+        expected_md5: Optional[str],
+        stat: Optional[Tuple[int, int]] = None,
+    ) -> bool:
+        """
+        True if the file is unchanged since it was verified against expected_md5.
+        stat is a known (size, mtime_ns), e.g. from a DestinationIndex, to skip the os.stat.
+        """
+        entry = self.lookup(filepath)
+        if entry is None or entry.md5 != expected_md5:
+            return False
+        if stat is None:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                return False
+            stat = (st.st_size, st.st_mtime_ns)
+        return stat == (entry.size, entry.mtime_ns)
+
+    def record(self, filepath: str, url: str, md5: Optional[str]) -> None:
+        st = os.stat(filepath)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, url, size, mtime_ns, md5, verified_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(filepath), url, st.st_size, st.st_mtime_ns, md5, time.time()),
+            )
+            self.conn.commit()
+
+    def forget(self, filepath: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (self._key(filepath),))
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,216 @@
+import contextlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+import aiohttp
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def merge(self, other: "Histogram"):
+        self.count += other.count
+        self.sum += other.sum
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.counts)},
+        }
+
+
+@dataclass(slots=True)
+class FileMetric:
+    filename: str
+    url: str
+    status: str
+    bytes: int
+    seconds: float
+    retries: int = 0
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+class RunMetrics:
+    """
+    Timings collected during one run: wall time per phase, per-host DNS,
+    connect and time-to-first-byte histograms from an aiohttp TraceConfig,
+    and running file totals. One record per processed file is only kept
+    with per_file, since it grows with the catalogue.
+    """
+
+    def __init__(self, per_file: bool = False):
+        self.started = time.time()
+        self.per_file = per_file
+        self.phases: Dict[str, float] = {}
+        self.requests: Dict[Tuple[str, str], Histogram] = {}
+        self.files: List[FileMetric] = []
+        self.file_count = 0
+        self.bytes = 0
+        self.retries = 0
+        self.statuses: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.monotonic() - started)
+
+    def add_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def observe_request(self, host: str, stage: str, seconds: float):
+        key = (host, stage)
+        if key not in self.requests:
+            self.requests[key] = Histogram()
+        self.requests[key].observe(seconds)
+
+    def record_file(self, filename: str, url: str, status: str, nbytes: int, seconds: float, retries: int = 0):
+        self.file_count += 1
+        self.bytes += nbytes
+        self.retries += retries
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if self.per_file:
+            self.files.append(FileMetric(filename, url, status, nbytes, seconds, retries))
+
+    def merge(self, other: "RunMetrics"):
+        """Fold in the requests and files of a worker process; phases stay the parent's own."""
+        for key, hist in other.requests.items():
+            if key not in self.requests:
+                self.requests[key] = Histogram(hist.buckets)
+            self.requests[key].merge(hist)
+        self.file_count += other.file_count
+        self.bytes += other.bytes
+        self.retries += other.retries
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.files.extend(other.files)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace(
+            trace_request_ctx=trace_request_ctx
+        ))
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host or ""
+            ctx.request_start = time.monotonic()
+
+        async def on_dns_start(session, ctx, params):
+            ctx.dns_start = time.monotonic()
+
+        async def on_dns_end(session, ctx, params):
+            self.observe_request(params.host, "dns", time.monotonic() - ctx.dns_start)
+
+        async def on_connection_start(session, ctx, params):
+            ctx.connect_start = time.monotonic()
+
+        async def on_connection_end(session, ctx, params):
+            self.observe_request(ctx.host, "connect", time.monotonic() - ctx.connect_start)
+
+        async def on_request_end(session, ctx, params):
+            # Fired once the response headers have arrived
+            self.observe_request(ctx.host, "ttfb", time.monotonic() - ctx.request_start)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connection_start)
+        trace.on_connection_create_end.append(on_connection_end)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def status_counts(self) -> Dict[str, int]:
+        return dict(self.statuses)
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "phases": self.phases,
+            "requests": {
+                f"{host} {stage}": hist.to_dict()
+                for (host, stage), hist in sorted(self.requests.items())
+            },
+            "files": [
+                {**asdict(f), "throughput": f.throughput}
+                for f in self.files
+            ],
+            "totals": {
+                "files": self.file_count,
+                "bytes": self.bytes,
+                "retries": self.retries,
+                "status": self.status_counts(),
+            },
+        }
+
+    def write_json(self, path: str):
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2))
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP polydown_phase_seconds Wall time spent in each phase of the last run.",
+            "# TYPE polydown_phase_seconds gauge",
+        ]
+        for name, seconds in sorted(self.phases.items()):
+            lines.append(f'polydown_phase_seconds{{phase="{name}"}} {seconds:.6f}')
+
+        lines += [
+            "# HELP polydown_files Files processed in the last run by status.",
+            "# TYPE polydown_files gauge",
+        ]
+        for status, count in sorted(self.status_counts().items()):
+            lines.append(f'polydown_files{{status="{status}"}} {count}')
+
+        lines += [
+            "# HELP polydown_bytes Bytes transferred in the last run.",
+            "# TYPE polydown_bytes gauge",
+            f"polydown_bytes {self.bytes}",
+            "# HELP polydown_retries Download retries in the last run.",
+            "# TYPE polydown_retries gauge",
+            f"polydown_retries {self.retries}",
+            "# HELP polydown_request_seconds DNS, connect and time-to-first-byte per host.",
+            "# TYPE polydown_request_seconds histogram",
+        ]
+        for (host, stage), hist in sorted(self.requests.items()):
+            labels = f'host="{host}",stage="{stage}"'
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f'polydown_request_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'polydown_request_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f"polydown_request_seconds_sum{{{labels}}} {hist.sum:.6f}")
+            lines.append(f"polydown_request_seconds_count{{{labels}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        # The node_exporter textfile collector must never see a partial file
+        _write_atomic(path, self.to_prometheus())
+
+
+def _write_atomic(path: str, content: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
@@ -0,0 +1,174 @@
+import asyncio
+import multiprocessing
+import queue
+from typing import AsyncIterator, List, Optional, Tuple
+
+from .destindex import DestinationIndex
+from .downloader import DownloadTask
+from .progress import ProgressReporter
+
+# Seconds between liveness checks while waiting on a queue
+POLL_INTERVAL = 0.5
+
+
+class QueueProgressReporter(ProgressReporter):
+    """
+    Forwards a worker process's download events to the parent over a queue.
+    Worker IDs are offset so the parent sees one contiguous set of workers
+    across all processes; byte counts are batched like any other reporter.
+    """
+
+    def __init__(self, worker_count: int, offset: int, events, interval: float = 0.1):
+        super().__init__(worker_count, interval)
+        self.offset = offset
+        self.events = events
+
+    def file_started(self, worker_id: int, task: DownloadTask):
+        self.events.put(("start", self.offset + worker_id, task))
+
+    def _publish(self, worker_id: int, nbytes: int, total_size: int):
+        self.events.put(("advance", self.offset + worker_id, nbytes, total_size))
+
+    def file_finished(self, worker_id: int, task: DownloadTask, status: str, verified: bool):
+        self._flush_worker(worker_id)
+        self.events.put(("finish", self.offset + worker_id, task, status, verified))
+
+    def file_retrying(self, worker_id: int, task: DownloadTask, attempt: int, delay: float):
+        self._flush_worker(worker_id)
+        self.events.put(("retry", self.offset + worker_id, task, attempt, delay))
+
+
+def _process_main(index: int, options: dict, folder: str, dest_index: Optional[DestinationIndex], tasks, events):
+    """Worker process entry point: one event loop, session pool and DownloadManager."""
+    try:
+        outcome, metrics = asyncio.run(_process_run(index, options, folder, dest_index, tasks, events))
+    except KeyboardInterrupt:
+        return
+    except Exception as e:
+        events.put(("error", index, f"{type(e).__name__}: {e}"))
+        outcome, metrics = None, None
+    events.put(("done", index, outcome, metrics))
+
+
+async def _process_run(index: int, options: dict, folder: str, dest_index, tasks, events):
+    # Imported here: the controller imports this module
+    from .controller import PolydownController, console
+    from .manifest import LibraryManifest
+
+    # The parent owns the terminal
+    console.quiet = True
+    controller = PolydownController(progress="none", scheduling="fifo", **options)
+    worker_count = controller._worker_count()
+    reporter = QueueProgressReporter(worker_count, index * worker_count, events)
+    loop = asyncio.get_running_loop()
+
+    async def produce(put):
+        while True:
+            task = await loop.run_in_executor(None, tasks.get)
+            if task is None:
+                break
+            await put(task)
+
+    async with controller.create_session_pool() as sessions:
+        manifest = LibraryManifest(folder) if controller.use_manifest else None
+        downloader = controller._create_downloader(sessions, manifest, dest_index)
+        try:
+            with reporter:
+                outcome = await controller._run_workers(downloader, produce, folder, worker_count, reporter)
+        finally:
+            downloader.close()
+            if manifest:
+                manifest.close()
+    return outcome, controller.metrics
+
+
+class ProcessEngine:
+    """
+    N download processes fed from one shared task queue.
+    The parent submits tasks and reads the events of every process:
+    ("start" | "advance" | "finish" | "retry", worker_id, ...) for progress,
+    ("error", process, message) and finally ("done", process, outcome, metrics)
+    once per process. A process that dies without reporting yields
+    ("died", process, exitcode) instead.
+    """
+
+    def __init__(self, processes: int, workers_per_process: int):
+        self.processes = processes
+        self.workers_per_process = workers_per_process
+        # Spawned, not forked: the parent has a running event loop and writer threads
+        self._context = multiprocessing.get_context("spawn")
+        self.tasks = self._context.Queue(maxsize=processes * workers_per_process * 2)
+        self.events = self._context.Queue()
+        self._procs: List[multiprocessing.Process] = []
+
+    @property
+    def worker_count(self) -> int:
+        return self.processes * self.workers_per_process
+
+    def start(self, options: dict, folder: str, dest_index: Optional[DestinationIndex]):
+        for i in range(self.processes):
+            proc = self._context.Process(
+                target=_process_main,
+                args=(i, options, folder, dest_index, self.tasks, self.events),
+                name=f"polydown-worker-{i + 1}",
+                daemon=True,
+            )
+            proc.start()
+            self._procs.append(proc)
+
+    def _alive(self) -> bool:
+        return any(proc.is_alive() for proc in self._procs)
+
+    def _put(self, item):
+        while True:
+            try:
+                self.tasks.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                if not self._alive():
+                    raise RuntimeError("All download processes have exited")
+
+    async def submit(self, task: DownloadTask):
+        """Hand a task to whichever process is free; waits while the shared queue is full."""
+        await asyncio.get_running_loop().run_in_executor(None, self._put, task)
+
+    async def finish(self):
+        """No more tasks: one sentinel per process."""
+        loop = asyncio.get_running_loop()
+        for _ in self._procs:
+            await loop.run_in_executor(None, self._put, None)
+
+    def _get(self) -> Optional[Tuple]:
+        try:
+            return self.events.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            return None
+
+    async def iter_events(self) -> AsyncIterator[Tuple]:
+        loop = asyncio.get_running_loop()
+        running = set(range(len(self._procs)))
+        # A dead process's last events may still be in the pipe on the first empty poll
+        suspect = set()
+        while running:
+            event = await loop.run_in_executor(None, self._get)
+            if event is None:
+                for i in sorted(running):
+                    if self._procs[i].is_alive():
+                        continue
+                    if i in suspect:
+                        running.discard(i)
+                        yield ("died", i, self._procs[i].exitcode)
+                    else:
+                        suspect.add(i)
+                continue
+            if event[0] == "done":
+                running.discard(event[1])
+            yield event
+
+    def close(self):
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self.tasks.close()
+        self.events.close()
@@ -0,0 +1,228 @@
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, TextIO
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.progress import (
+    Progress,
+    BarColumn,
+    TextColumn,
+    TimeRemainingColumn,
+    DownloadColumn,
+    TransferSpeedColumn,
+)
+
+from .downloader import DownloadTask
+
+PROGRESS_MODES = ["rich", "jsonl", "none"]
+
+
+class ProgressReporter:
+    """
+    Receives download events from the controller's workers.
+    Byte counts arrive once per chunk and are only accumulated here;
+    subclasses publish them at most ``interval`` seconds apart.
+    """
+
+    def __init__(self, worker_count: int, interval: float = 0.1):
+        self.worker_count = worker_count
+        self.interval = interval
+        self._pending: List[int] = [0] * worker_count
+        self._totals: List[int] = [0] * worker_count
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def discovered(self, total: int, done: bool = False):
+        pass
+
+    def file_started(self, worker_id: int, task: DownloadTask):
+        pass
+
+    def advance(self, worker_id: int, nbytes: int, total_size: int):
+        self._pending[worker_id] += nbytes
+        self._totals[worker_id] = total_size
+        now = time.monotonic()
+        if now - self._last_flush >= self.interval:
+            self._last_flush = now
+            self.flush()
+
+    def file_finished(self, worker_id: int, task: DownloadTask, status: str, verified: bool):
+        pass
+
+    def file_retrying(self, worker_id: int, task: DownloadTask, attempt: int, delay: float):
+        pass
+
+    def summary(self, results: Dict[str, int]):
+        pass
+
+    def flush(self):
+        for worker_id in range(self.worker_count):
+            self._flush_worker(worker_id)
+
+    def _flush_worker(self, worker_id: int):
+        nbytes = self._pending[worker_id]
+        if nbytes:
+            self._pending[worker_id] = 0
+            self._publish(worker_id, nbytes, self._totals[worker_id])
+
+    def _publish(self, worker_id: int, nbytes: int, total_size: int):
+        pass
+
+
+class RichProgressReporter(ProgressReporter):
+    """The live two-panel view: overall file count plus one bar per worker."""
+
+    def __init__(self, worker_count: int, console: Console, interval: float = 0.1):
+        super().__init__(worker_count, interval)
+        self.overall_progress = Progress(
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TextColumn("({task.completed}/{task.total})"),
+            TimeRemainingColumn(),
+        )
+
+        self.worker_progress = Progress(
+            TextColumn("[bold green]{task.description}"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+        )
+
+        progress_group = Group(
+            Panel(self.overall_progress, title="Overall Progress", border_style="blue"),
+            Panel(self.worker_progress, title="Worker Threads", border_style="green")
+        )
+
+        self.overall_task_id = self.overall_progress.add_task("Total Files (discovering...)", total=None)
+        self.worker_task_ids = [
+            self.worker_progress.add_task(f"Worker {i+1}: Idle", visible=True, total=None)
+            for i in range(worker_count)
+        ]
+        self.live = Live(progress_group, console=console, refresh_per_second=10)
+
+    def __enter__(self):
+        self.live.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        self.live.__exit__(exc_type, exc, tb)
+
+    def discovered(self, total: int, done: bool = False):
+        if done:
+            self.overall_progress.update(self.overall_task_id, description="Total Files", total=total)
+        else:
+            self.overall_progress.update(self.overall_task_id, total=total)
+
+    def file_started(self, worker_id: int, task: DownloadTask):
+        # Colorize filename based on type
+        fname = task.filename
+        lower_name = fname.lower()
+        color = "white"
+
+        if lower_name.endswith(".blend"):
+            color = "bold cyan"
+        elif lower_name.endswith((".exr", ".hdr")):
+            color = "bold yellow"
+        elif lower_name.endswith((".png", ".jpg", ".jpeg")):
+            # Distinguish between previews/renders and actual texture maps
+            if any(x in lower_name for x in ["thumb", "primary", "renders"]):
+                color = "magenta"
+            else:
+                color = "green"
+
+        self.worker_progress.update(
+            self.worker_task_ids[worker_id],
+            description=f"Worker {worker_id+1}: [{color}]{fname}[/{color}]",
+            total=None,
+            completed=0,
+            visible=True
+        )
+
+    def _publish(self, worker_id: int, nbytes: int, total_size: int):
+        self.worker_progress.update(self.worker_task_ids[worker_id], total=total_size, advance=nbytes)
+
+    def file_finished(self, worker_id: int, task: DownloadTask, status: str, verified: bool):
+        self._flush_worker(worker_id)
+        self.overall_progress.advance(self.overall_task_id)
+        self.worker_progress.update(
+            self.worker_task_ids[worker_id], description=f"Worker {worker_id+1}: Idle", visible=True
+        )
+
+    def file_retrying(self, worker_id: int, task: DownloadTask, attempt: int, delay: float):
+        # The file comes back through the queue, so it is not counted as done
+        self._flush_worker(worker_id)
+        self.worker_progress.update(
+            self.worker_task_ids[worker_id], description=f"Worker {worker_id+1}: Idle", visible=True
+        )
+
+
+class JsonLinesProgressReporter(ProgressReporter):
+    """Structured events, one JSON object per line, for headless runs."""
+
+    def __init__(self, worker_count: int, stream: Optional[TextIO] = None, interval: float = 1.0):
+        super().__init__(worker_count, interval)
+        self.stream = stream or sys.stdout
+        self.started = time.monotonic()
+        self.bytes_done = 0
+
+    def _emit(self, event: str, **fields):
+        record = {"event": event, "t": round(time.monotonic() - self.started, 3), **fields}
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def discovered(self, total: int, done: bool = False):
+        if done:
+            self._emit("discovered", total=total, done=True)
+
+    def file_started(self, worker_id: int, task: DownloadTask):
+        self._emit("start", worker=worker_id, file=task.filename, url=task.url, size=task.size)
+
+    def flush(self):
+        before = self.bytes_done
+        super().flush()
+        if self.bytes_done != before:
+            elapsed = time.monotonic() - self.started
+            self._emit("progress", bytes=self.bytes_done, rate=round(self.bytes_done / elapsed) if elapsed else 0)
+
+    def _publish(self, worker_id: int, nbytes: int, total_size: int):
+        self.bytes_done += nbytes
+
+    def file_finished(self, worker_id: int, task: DownloadTask, status: str, verified: bool):
+        self._flush_worker(worker_id)
+        self._emit(
+            "finish",
+            worker=worker_id,
+            file=task.filename,
+            path=os.path.join(task.destination_folder, task.filename),
+            status=status,
+            verified=verified,
+        )
+
+    def file_retrying(self, worker_id: int, task: DownloadTask, attempt: int, delay: float):
+        self._flush_worker(worker_id)
+        self._emit("retry", worker=worker_id, file=task.filename, attempt=attempt, delay=round(delay, 3))
+
+    def summary(self, results: Dict[str, int]):
+        self.flush()
+        self._emit("summary", bytes=self.bytes_done, **results)
+
+
+def create_reporter(mode: str, worker_count: int, console: Console) -> ProgressReporter:
+    if mode == "rich":
+        return RichProgressReporter(worker_count, console)
+    if mode == "jsonl":
+        return JsonLinesProgressReporter(worker_count)
+    if mode == "none":
+        return ProgressReporter(worker_count)
+    raise ValueError(f"Unknown progress mode: {mode}")
@@ -0,0 +1,71 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+# Statuses that say "try again later" rather than "this will never work"
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with jitter.
+    Attempt n waits ``base_delay * 2 ** (n - 1)`` seconds, capped at
+    ``max_delay``, of which a random ``jitter`` fraction is spread out so
+    that parallel workers hitting the same 503 do not retry in lockstep.
+    A ``Retry-After`` header always wins over the computed delay.
+    """
+
+    attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    jitter: float = 0.5
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in RETRYABLE_STATUSES
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError))
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait before retrying after the given (1-based) failed attempt."""
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        backoff = backoff * (1 - self.jitter) + random.uniform(0, backoff * self.jitter)
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            return max(backoff, retry_after)
+        return backoff
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Await func(), retrying retryable errors until the attempts run out."""
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                if attempt >= self.attempts or not self.is_retryable(e):
+                    raise
+                await asyncio.sleep(self.delay(attempt, e))
+                attempt += 1
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) from a response error."""
+    headers = getattr(error, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,65 @@
+import asyncio
+import bisect
+import itertools
+from collections import deque
+from typing import Optional
+
+from .downloader import DownloadTask
+
+SCHEDULING_POLICIES = ["fifo", "largest", "smallest", "interleaved"]
+
+
+class ScheduledQueue(asyncio.Queue):
+    """
+    Task queue that hands out DownloadTasks according to a size policy.
+
+    fifo:        discovery order
+    largest:     biggest file first, so huge files do not form the tail of a run
+    smallest:    smallest file first
+    interleaved: alternate between the biggest and the smallest file
+
+    Tasks without a known size count as 0 bytes. ``None`` is the worker stop
+    sentinel and is only handed out once no real task is left.
+    """
+
+    def __init__(self, policy: str = "fifo", maxsize: int = 0):
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.policy = policy
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = deque() if self.policy == "fifo" else []
+        self._sentinels = 0
+        self._counter = itertools.count()
+        self._take_largest = True
+
+    def qsize(self) -> int:
+        return len(self._queue) + self._sentinels
+
+    def empty(self) -> bool:
+        return not self._queue and not self._sentinels
+
+    def _put(self, item: Optional[DownloadTask]):
+        if item is None:
+            self._sentinels += 1
+        elif self.policy == "fifo":
+            self._queue.append(item)
+        else:
+            bisect.insort(self._queue, (item.size or 0, next(self._counter), item))
+
+    def _get(self) -> Optional[DownloadTask]:
+        if not self._queue:
+            self._sentinels -= 1
+            return None
+        if self.policy == "fifo":
+            return self._queue.popleft()
+
+        if self.policy == "largest":
+            take_largest = True
+        elif self.policy == "smallest":
+            take_largest = False
+        else:
+            take_largest = self._take_largest
+            self._take_largest = not self._take_largest
+        return self._queue.pop(-1 if take_largest else 0)[2]
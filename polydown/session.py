@@ -0,0 +1,66 @@
+import aiohttp
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+API_HOST = "api.polyhaven.com"
+CDN_HOST = "cdn.polyhaven.com"
+
+
+class SessionPool:
+    """
+    One aiohttp session per host, each with its own connection pool.
+    Small API and preview-image requests never wait for a connection held by
+    a large file stream. Exposes the ``get``/``head`` subset of
+    ``aiohttp.ClientSession`` so it can be passed wherever a session is used.
+    """
+
+    def __init__(
+        self,
+        host_limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 16,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60,
+        trace_configs: Optional[List[aiohttp.TraceConfig]] = None,
+    ):
+        self.host_limits = host_limits or {}
+        self.default_limit = default_limit
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.trace_configs = trace_configs
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        host = urlsplit(url).hostname or ""
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            limit = self.host_limits.get(host, self.default_limit)
+            connector = aiohttp.TCPConnector(
+                limit=limit,
+                limit_per_host=limit,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120),
+                trace_configs=self.trace_configs,
+            )
+            self._sessions[host] = session
+        return session
+
+    def get(self, url: str, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.session_for(url).head(url, **kwargs)
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
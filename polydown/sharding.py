@@ -0,0 +1,100 @@
+import hashlib
+import heapq
+import json
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .downloader import DownloadTask
+
+SHARD_MODES = ["assets", "bytes"]
+SHARD_SUMMARY_PREFIX = ".polydown-shard-"
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "i/N" (1-based) into (i, N)."""
+    index, sep, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 1/4") from None
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', expected 1 <= i <= N")
+    return index, count
+
+
+def _stable_hash(key: str) -> int:
+    # Python's hash() is salted per process, every machine must agree
+    return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+
+def shard_assets(assets: List[str], index: int, count: int) -> List[str]:
+    """
+    Assets whose ID hashes to this shard.
+    Independent of the catalogue order, and an asset added upstream never
+    moves the existing ones to another shard.
+    """
+    return [asset for asset in assets if _stable_hash(asset) % count == index - 1]
+
+
+def shard_tasks(tasks: List[DownloadTask], index: int, count: int) -> List[DownloadTask]:
+    """
+    Files of this shard, balanced by byte size.
+    Largest-first greedy assignment to the lightest shard over the full task
+    list, so every process computes the same partition from the same
+    metadata. Files without a size (preview images) are spread by hash.
+    """
+    # Keyed by URL and name, never by the local destination, which differs per machine
+    def key(task: DownloadTask) -> str:
+        return f"{task.url} {task.filename}"
+
+    sized = sorted((t for t in tasks if t.size), key=lambda t: (-t.size, key(t)))
+    loads = [(0, shard) for shard in range(count)]
+    mine = set()
+    for task in sized:
+        load, shard = heapq.heappop(loads)
+        if shard == index - 1:
+            mine.add(id(task))
+        heapq.heappush(loads, (load + task.size, shard))
+
+    return [
+        task for task in tasks
+        if id(task) in mine or (not task.size and _stable_hash(key(task)) % count == index - 1)
+    ]
+
+
+def shard_summary_path(folder: str, index: int, count: int) -> str:
+    return os.path.join(folder, f"{SHARD_SUMMARY_PREFIX}{index}-of-{count}.json")
+
+
+def write_shard_summary(
+    path: str,
+    index: int,
+    count: int,
+    mode: str,
+    results: Dict[str, int],
+    tasks: int,
+    planned_bytes: int,
+    transferred_bytes: int,
+    started: float,
+    failed_output: Optional[str] = None,
+):
+    """One JSON document per shard; numeric fields can simply be summed across shards."""
+    summary = {
+        "shard": index,
+        "shards": count,
+        "shard_by": mode,
+        "host": socket.gethostname(),
+        "started": started,
+        "finished": time.time(),
+        "tasks": tasks,
+        "planned_bytes": planned_bytes,
+        "transferred_bytes": transferred_bytes,
+        "results": results,
+        "failed_output": failed_output,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,46 @@
+import os
+import shutil
+import uuid
+
+
+class BlobStore:
+    """
+    Content-addressed store of verified files, keyed by MD5.
+    Blobs live at ``<root>/<md5[:2]>/<md5>`` and are hardlinked into the
+    download layout, so identical files are stored once per filesystem.
+    Linking falls back to a copy across filesystems.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def path_for(self, md5: str) -> str:
+        md5 = md5.lower()
+        return os.path.join(self.root, md5[:2], md5)
+
+    def has(self, md5: str) -> bool:
+        return os.path.exists(self.path_for(md5))
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: str) -> None:
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+
+    def add(self, filepath: str, md5: str) -> None:
+        """Adopt a verified file into the store unless its content is already there."""
+        blob = self.path_for(md5)
+        if os.path.exists(blob):
+            return
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp = f"{blob}.{uuid.uuid4().hex}.tmp"
+        self._link_or_copy(filepath, tmp)
+        os.replace(tmp, blob)
+
+    def materialize(self, md5: str, filepath: str) -> None:
+        """Place the blob at filepath, replacing any existing file atomically."""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        tmp = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        self._link_or_copy(self.path_for(md5), tmp)
+        os.replace(tmp, filepath)
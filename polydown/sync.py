@@ -0,0 +1,178 @@
+import asyncio
+import dataclasses
+import os
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+from .destindex import DestinationIndex
+from .downloader import DownloadManager, DownloadTask
+from .manifest import LibraryManifest
+
+
+@dataclass
+class SyncPlan:
+    new: List[DownloadTask] = field(default_factory=list)
+    changed: List[DownloadTask] = field(default_factory=list)
+    unchanged: List[DownloadTask] = field(default_factory=list)
+    prune: List[str] = field(default_factory=list)
+
+    @property
+    def tasks(self) -> List[DownloadTask]:
+        """Tasks that need a transfer, changed files marked for overwrite."""
+        return self.new + self.changed
+
+    @staticmethod
+    def _bytes(tasks: List[DownloadTask]) -> int:
+        return sum(t.size or 0 for t in tasks)
+
+    @property
+    def new_bytes(self) -> int:
+        return self._bytes(self.new)
+
+    @property
+    def changed_bytes(self) -> int:
+        return self._bytes(self.changed)
+
+    @property
+    def unknown_size(self) -> int:
+        """Number of queued tasks whose size the API does not report (preview images)."""
+        return sum(1 for t in self.tasks if t.size is None)
+
+    @property
+    def prune_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in self.prune if os.path.exists(p))
+
+
+@dataclass
+class Catalogue:
+    """
+    Every file URL of one asset type, whatever the selection, and the asset
+    IDs of the other types, whose files may share the library root.
+    """
+    urls: Set[str] = field(default_factory=set)
+    other_assets: Set[str] = field(default_factory=set)
+
+    def owned_elsewhere(self, manifest_path: str) -> bool:
+        """True if the path is an asset folder or file named after an asset of another type."""
+        return asset_of(manifest_path, self.other_assets) is not None
+
+
+def asset_of(relative_path: str, asset_ids: Set[str]) -> Optional[str]:
+    """
+    The asset a library path belongs to: its first component, an asset folder
+    or a file named <asset>_..., or the longest underscore prefix of it that
+    is one of asset_ids. None if it belongs to none of them.
+    """
+    parts = relative_path.split("/")[0].split("_")
+    for i in range(len(parts), 0, -1):
+        candidate = "_".join(parts[:i])
+        if candidate in asset_ids:
+            return candidate
+    return None
+
+
+def file_urls(data: Any) -> Iterator[str]:
+    """Every "url" in a /files response, at any depth."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "url" and isinstance(value, str):
+                yield value
+            else:
+                yield from file_urls(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from file_urls(value)
+
+
+def _recorded_md5(path: str, manifest: LibraryManifest, stat: Optional[Tuple[int, int]]) -> Optional[str]:
+    """The manifest's MD5 for path if the file is unchanged since it was recorded."""
+    entry = manifest.lookup(path)
+    if entry and entry.md5:
+        if stat is None:
+            st = os.stat(path)
+            stat = (st.st_size, st.st_mtime_ns)
+        if stat == (entry.size, entry.mtime_ns):
+            return entry.md5
+    return None
+
+
+async def _local_md5(
+    path: str,
+    manifest: Optional[LibraryManifest],
+    stat: Optional[Tuple[int, int]] = None,
+    deep_verify: bool = False,
+) -> str:
+    loop = asyncio.get_running_loop()
+    if manifest and not deep_verify:
+        md5 = await loop.run_in_executor(None, _recorded_md5, path, manifest, stat)
+        if md5:
+            return md5
+
+    hasher = await loop.run_in_executor(None, DownloadManager._md5_of_file_sync, path)
+    return hasher.hexdigest()
+
+
+def _refresh_entry(manifest: LibraryManifest, task: DownloadTask, path: str, stat, deep_verify: bool):
+    if deep_verify or not manifest.is_current(path, task.md5, stat):
+        manifest.record(path, task.url, task.md5)
+
+
+async def plan_sync(
+    tasks: List[DownloadTask],
+    manifest: Optional[LibraryManifest],
+    catalogue: Optional[Catalogue] = None,
+    index: Optional[DestinationIndex] = None,
+    deep_verify: bool = False,
+) -> SyncPlan:
+    """
+    Compare remote MD5s against local files.
+    Every manifest call runs in the executor: a record stats the file and
+    commits, once per existing file.
+    With a catalogue, manifest-tracked files whose URL it no longer lists
+    are marked for pruning; the selection in tasks plays no part in that.
+    Local hashes come from the manifest when the file is unchanged since it was
+    recorded, otherwise the file is hashed once and the result is recorded.
+    With an index, existence, size and mtime come from it instead of stat calls.
+    deep_verify rehashes every file and refreshes its manifest row.
+    """
+    plan = SyncPlan()
+    loop = asyncio.get_running_loop()
+
+    def exists(path: str) -> bool:
+        return index.exists(path) if index else os.path.exists(path)
+
+    async def classify(task: DownloadTask):
+        path = os.path.join(task.destination_folder, task.filename)
+        if not exists(path):
+            plan.new.append(task)
+            return
+        if not task.md5:
+            # Nothing to compare against (preview images)
+            plan.unchanged.append(task)
+            return
+
+        stat = index.stat(path) if index else None
+        local_md5 = await _local_md5(path, manifest, stat, deep_verify)
+        if local_md5 == task.md5:
+            if manifest:
+                await loop.run_in_executor(None, _refresh_entry, manifest, task, path, stat, deep_verify)
+            plan.unchanged.append(task)
+        else:
+            plan.changed.append(dataclasses.replace(task, overwrite=True))
+
+    await asyncio.gather(*[classify(t) for t in tasks])
+
+    if catalogue is not None and manifest:
+        def prunable() -> List[str]:
+            paths = []
+            for entry in manifest.entries():
+                if entry.url in catalogue.urls or catalogue.owned_elsewhere(entry.path):
+                    continue
+                path = manifest.absolute_path(entry)
+                if exists(path):
+                    paths.append(path)
+            return paths
+
+        plan.prune = await loop.run_in_executor(None, prunable)
+
+    return plan
@@ -0,0 +1,110 @@
+import dataclasses
+import hashlib
+import json
+import os
+from typing import Iterable, List, Optional, Set
+
+from .downloader import DownloadTask
+
+FAILED_FILENAME = ".polydown-failed.jsonl"
+
+_TASK_FIELDS = {f.name for f in dataclasses.fields(DownloadTask)}
+
+
+def task_to_dict(task: DownloadTask, **extra) -> dict:
+    return {**dataclasses.asdict(task), **extra}
+
+
+def task_from_dict(record: dict, root: Optional[str] = None) -> DownloadTask:
+    # Extra keys such as "error" or "attempts" are informational only
+    task = DownloadTask(**{k: v for k, v in record.items() if k in _TASK_FIELDS})
+    if root:
+        # Plans store destinations relative to the library root; absolute ones are kept
+        task.destination_folder = os.path.normpath(os.path.join(root, task.destination_folder))
+    return task
+
+
+def plan_record(task: DownloadTask, root: str, **extra) -> dict:
+    """A task with its destination relative to root, so the plan can be applied on another machine."""
+    return task_to_dict(task, destination_folder=os.path.relpath(task.destination_folder, root), **extra)
+
+
+def write_task_list(path: str, records: Iterable[dict]):
+    """Write one JSON object per line, atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.replace(tmp_path, path)
+
+
+def read_task_list(path: str, root: Optional[str] = None) -> List[DownloadTask]:
+    tasks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                tasks.append(task_from_dict(json.loads(line), root))
+    return tasks
+
+
+def plan_digest(path: str) -> str:
+    """SHA-256 of a plan file's content, so a checkpoint can tell when the plan changed."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class PlanCheckpoint:
+    """
+    Append-only record of completed plan entries, stored next to the plan.
+    Every finished file is flushed immediately so an interrupted apply
+    restarts without looking at the entries it already completed.
+    Entries are keyed on destination, URL and MD5, so a re-published file
+    is not mistaken for a completed one. The first line holds the digest of
+    the plan it belongs to; a checkpoint written for other plan content is
+    started over.
+    """
+
+    def __init__(self, path: str, plan_digest: Optional[str] = None):
+        self.path = path
+        self.completed: Set[str] = set()
+        header = f"# plan {plan_digest or '-'}"
+        fresh = True
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [line.rstrip("\n") for line in f if line.strip()]
+            if lines and lines[0] == header:
+                self.completed = set(lines[1:])
+                fresh = False
+        self._file = open(path, "w" if fresh else "a", encoding="utf-8")
+        if fresh:
+            self._file.write(header + "\n")
+            self._file.flush()
+
+    @staticmethod
+    def key(task: DownloadTask) -> str:
+        return "\t".join([os.path.join(task.destination_folder, task.filename), task.url, task.md5 or ""])
+
+    def __contains__(self, task: DownloadTask) -> bool:
+        return self.key(task) in self.completed
+
+    def mark(self, task: DownloadTask):
+        key = self.key(task)
+        if key not in self.completed:
+            self.completed.add(key)
+            self._file.write(key + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def remove(self):
+        """The whole plan is done: nothing is left to resume."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+from .downloader import DownloadTask
+from .estimate import STATS_FILENAME, classify_filename, file_format
+from .manifest import MANIFEST_FILENAME, LibraryManifest
+from .sharding import SHARD_SUMMARY_PREFIX
+from .sync import asset_of
+from .tasklist import FAILED_FILENAME
+
+# Files polydown itself keeps next to the library
+IGNORED_SUFFIXES = (".part", ".validator", ".tmp", ".done", "-wal", "-shm", "-journal")
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def md5_of_file(path: str, block_size: int = HASH_BLOCK_SIZE) -> str:
+    """MD5 of a file, reading it through mmap in large blocks."""
+    hasher = hashlib.md5()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hasher.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(0, size, block_size):
+                    hasher.update(view[offset:offset + block_size])
+            finally:
+                view.release()
+    return hasher.hexdigest()
+
+
+def _hash_job(path: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Process pool entry point. Returns: (path, md5, error)"""
+    try:
+        return path, md5_of_file(path), None
+    except OSError as e:
+        return path, None, str(e)
+
+
+@dataclass
+class VerifyReport:
+    ok: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    corrupt: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+    bytes_hashed: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return not (self.missing or self.corrupt or self.errors)
+
+
+def _scan_files(root: str) -> List[str]:
+    found = []
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if (
+                        entry.name in (MANIFEST_FILENAME, FAILED_FILENAME, STATS_FILENAME)
+                        or entry.name.startswith(SHARD_SUMMARY_PREFIX)
+                        or entry.name.endswith(IGNORED_SUFFIXES)
+                    ):
+                        continue
+                    found.append(os.path.abspath(entry.path))
+    return found
+
+
+async def verify_library(
+    tasks: List[DownloadTask],
+    root: str,
+    processes: Optional[int] = None,
+    manifest: Optional[LibraryManifest] = None,
+    assets: Optional[Set[str]] = None,
+    sizes: Optional[Set[str]] = None,
+) -> VerifyReport:
+    """
+    Check every expected file under root.
+    Hashing is spread over a process pool so throughput is bound by the disk,
+    not by one core. Files that pass are recorded in the manifest.
+    Without assets every unexpected file under root is extra. With them,
+    only files of those assets in one of sizes (any, if None) and a format
+    the expected files use are: the root may hold other asset types and
+    files outside the selection.
+    """
+    report = VerifyReport()
+    loop = asyncio.get_running_loop()
+
+    expected = {}
+    for task in tasks:
+        expected[os.path.abspath(os.path.join(task.destination_folder, task.filename))] = task
+
+    to_hash = []
+    for path, task in expected.items():
+        if not os.path.exists(path):
+            report.missing.append(path)
+        elif task.md5:
+            to_hash.append(path)
+        else:
+            # Nothing to compare against (preview images)
+            report.ok.append(path)
+
+    # Spawned, not forked: the caller has a running event loop and writer threads
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = await asyncio.gather(*[
+            loop.run_in_executor(pool, _hash_job, path) for path in to_hash
+        ])
+
+    for path, digest, error in results:
+        task = expected[path]
+        if error:
+            report.errors.append((path, error))
+        elif digest == task.md5:
+            report.ok.append(path)
+            report.bytes_hashed += os.path.getsize(path)
+            if manifest:
+                manifest.record(path, task.url, task.md5)
+        else:
+            report.corrupt.append(path)
+            report.bytes_hashed += os.path.getsize(path)
+
+    if os.path.isdir(root):
+        scanned = await loop.run_in_executor(None, _scan_files, root)
+        formats = {file_format(task.filename) for task in tasks}
+
+        def is_extra(path: str) -> bool:
+            if path in expected:
+                return False
+            if assets is None:
+                return True
+            asset_id = asset_of(os.path.relpath(path, root).replace(os.sep, "/"), assets)
+            if asset_id is None:
+                return False
+            size, fmt, _ = classify_filename(asset_id, os.path.basename(path))
+            return fmt in formats and (sizes is None or size in sizes)
+
+        report.extra = sorted(p for p in scanned if is_extra(p))
+
+    report.missing.sort()
+    report.corrupt.sort()
+    return report
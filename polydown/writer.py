@@ -0,0 +1,157 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+class DiskWriter:
+    """
+    Thread pool that performs all blocking file writes for a DownloadManager.
+    The event loop only hands over coalesced buffers.
+    """
+
+    def __init__(self, max_workers: int = 4, buffer_size: int = 1024 * 1024, max_pending: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polydown-writer")
+        self.buffer_size = buffer_size
+        self.max_pending = max_pending
+
+    async def run(self, func, *args):
+        """Run a blocking filesystem call on the writer pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def open(
+        self,
+        path: str,
+        offset: int = 0,
+        truncate: bool = True,
+        preallocate: Optional[int] = None,
+        trim: bool = False,
+    ) -> "FileSink":
+        """
+        Open path for writing at offset.
+        With trim, the file is cut to the last byte actually written when the
+        sink closes, so a preallocated file never looks longer than its data.
+        """
+        fd = await self.run(_open_sync, path, truncate, preallocate)
+        return FileSink(self, fd, offset, trim)
+
+    async def preallocate(self, path: str, size: int):
+        fd = await self.run(_open_sync, path, True, size)
+        await self.run(os.close, fd)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def _open_sync(path: str, truncate: bool, preallocate: Optional[int]) -> int:
+    flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    if truncate:
+        flags |= os.O_TRUNC
+    fd = os.open(path, flags, 0o644)
+    if preallocate:
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, preallocate)
+            else:
+                os.ftruncate(fd, preallocate)
+        except OSError:
+            # Not supported by every filesystem; the file simply grows as written
+            pass
+    return fd
+
+
+def _pwrite_sync(fd: int, data: bytes, offset: int):
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while data:
+            data = data[os.write(fd, data):]
+
+
+def _close_sync(fd: int, trim_to: Optional[int]):
+    try:
+        if trim_to is not None:
+            os.ftruncate(fd, trim_to)
+    finally:
+        os.close(fd)
+
+
+class FileSink:
+    """
+    Write handle for one file (or one byte range of it).
+    Chunks are coalesced into ``buffer_size`` writes at explicit offsets, so
+    writes may complete in any order. At most ``max_pending`` writes are in
+    flight; further writes wait, which throttles the network stream.
+    """
+
+    def __init__(self, writer: DiskWriter, fd: int, offset: int = 0, trim: bool = False):
+        self.writer = writer
+        self.fd = fd
+        self.offset = offset
+        self.trim = trim
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._pending: Dict[asyncio.Future, int] = {}
+        self._valid_upto = float("inf")
+        # Without pwrite, writes share the file position and must not overlap
+        self._max_pending = writer.max_pending if hasattr(os, "pwrite") else 1
+
+    async def write(self, chunk: bytes):
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.writer.buffer_size:
+            await self._submit()
+
+    async def _submit(self):
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        while len(self._pending) >= self._max_pending:
+            done, _ = await asyncio.wait(list(self._pending), return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                start = self._pending.pop(fut)
+                if fut.exception():
+                    self._valid_upto = min(self._valid_upto, start)
+                    raise fut.exception()
+
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(self.writer.executor, _pwrite_sync, self.fd, data, self.offset)
+        self._pending[fut] = self.offset
+        self.offset += len(data)
+
+    async def close(self):
+        """Flush buffered data, wait for every write and close the file."""
+        error = None
+        try:
+            await self._submit()
+        except BaseException as e:
+            error = e
+
+        # Every write must finish before the descriptor is closed
+        valid_upto = min(self.offset, self._valid_upto)
+        if self._pending:
+            futures = list(self._pending)
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            for fut, result in zip(futures, results):
+                if isinstance(result, BaseException):
+                    valid_upto = min(valid_upto, self._pending[fut])
+                    error = error or result
+            self._pending.clear()
+
+        await self.writer.run(_close_sync, self.fd, valid_upto if self.trim else None)
+        if error:
+            raise error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from polydown.api import PolyHavenClient
+from polydown.api import OfflineMetadataError, PolyHavenClient
+from polydown.cache import CacheEntry, MetadataCache
 
 @pytest.mark.asyncio
 async def test_get_asset_types():
@@ -30,3 +31,46 @@ async def test_get_assets():
 
     assert set(assets) == {"asset1", "asset2"}
     mock_session.get.assert_called_with("https://api.polyhaven.com/assets?t=hdris")
+
+@pytest.mark.asyncio
+async def test_cached_response_skips_network(tmp_path):
+    mock_session = MagicMock()
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status = 200
+    mock_response.headers = {"ETag": '"v1"'}
+    mock_response.json.return_value = ["hdris", "textures"]
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    cache = MetadataCache(str(tmp_path))
+    client = PolyHavenClient(mock_session, cache=cache)
+    assert await client.get_asset_types() == ["hdris", "textures"]
+    assert await client.get_asset_types() == ["hdris", "textures"]
+
+    assert mock_session.get.call_count == 1
+
+@pytest.mark.asyncio
+async def test_stale_cache_is_revalidated(tmp_path):
+    url = "https://api.polyhaven.com/types"
+    cache = MetadataCache(str(tmp_path), ttl=0)
+    cache.put(url, CacheEntry(data=["hdris"], fetched_at=0, etag='"v1"'))
+
+    mock_session = MagicMock()
+    mock_response = AsyncMock()
+    mock_response.status = 304
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    client = PolyHavenClient(mock_session, cache=cache)
+    assert await client.get_asset_types() == ["hdris"]
+
+    mock_session.get.assert_called_with(url, headers={"If-None-Match": '"v1"'})
+    assert cache.get(url).fetched_at > 0
+
+@pytest.mark.asyncio
+async def test_offline_metadata_requires_cache_entry(tmp_path):
+    mock_session = MagicMock()
+    client = PolyHavenClient(mock_session, cache=MetadataCache(str(tmp_path)), offline=True)
+
+    with pytest.raises(OfflineMetadataError):
+        await client.get_asset_types()
+    mock_session.get.assert_not_called()
@@ -0,0 +1,16 @@
+import os
+import pytest
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import MockConfig
+
+@pytest.mark.asyncio
+async def test_benchmark_harness_end_to_end(tmp_path):
+    config = MockConfig(assets=3, sizes=["1k", "2k"], file_size=256 * 1024)
+
+    result = await run_benchmark(config, folder=str(tmp_path), controller_options={"concurrency": 2})
+
+    assert result.files == 6
+    assert result.bytes == 6 * 256 * 1024
+    assert result.ttfb is not None
+    downloaded = sorted(f for f in os.listdir(tmp_path) if f.endswith(".hdr"))
+    assert downloaded == sorted(f"asset_{i:05d}_{s}.hdr" for i in range(3) for s in ["1k", "2k"])
@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import AsyncMock
+from polydown.budget import Rung, fit_to_budget, parse_size
+from polydown.controller import PolydownController
+from polydown.downloader import DownloadTask
+
+
+def _hdri_files(asset, sizes):
+    return {"hdri": {
+        size: {fmt: {"url": f"https://x/{asset}_{size}.{fmt}", "md5": "m", "size": nbytes * (2 if fmt == "exr" else 1)}
+               for fmt in ("hdr", "exr")}
+        for size, nbytes in sizes.items()
+    }}
+
+
+def _ladder(*sizes):
+    return [Rung(f"r{n}", [DownloadTask("u", "/lib", f"f{n}", size=n)]) for n in sizes]
+
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("750M") == 750 * 1024 ** 2
+    assert parse_size("1.5g") == int(1.5 * 1024 ** 3)
+    assert parse_size("2TiB") == 2 * 1024 ** 4
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_fit_to_budget_raises_assets_evenly():
+    ladders = {"a": _ladder(1, 4, 16), "b": _ladder(1, 4, 16), "c": _ladder(1, 4, 16)}
+
+    chosen = fit_to_budget(ladders, 24)
+
+    # 16 + 4 + 4 would fit too, but every asset gets the same size first
+    assert {asset: rung.label for asset, rung in chosen.items()} == {"a": "r16", "b": "r4", "c": "r4"}
+    assert fit_to_budget(ladders, 12) == {"a": ladders["a"][1], "b": ladders["b"][1], "c": ladders["c"][1]}
+
+
+def test_fit_to_budget_leaves_out_assets_that_never_fit():
+    ladders = {"a": _ladder(5, 10), "b": _ladder(5), "c": _ladder(2)}
+
+    chosen = fit_to_budget(ladders, 8)
+
+    assert {asset: rung.label for asset, rung in chosen.items()} == {"a": "r5", "c": "r2"}
+
+
+@pytest.mark.asyncio
+async def test_metadata_producer_picks_largest_size_within_budget():
+    files = {
+        "a": _hdri_files("a", {"1k": 10, "2k": 40, "4k": 160}),
+        "b": _hdri_files("b", {"1k": 10, "2k": 40, "4k": 160}),
+    }
+    client = AsyncMock()
+    client.get_files.side_effect = lambda asset: files[asset]
+    controller = PolydownController(max_bytes=100)
+    produce = controller._metadata_producer(
+        client, ["a", "b"], "hdris", "/lib", [], False, True, False, "hdr", None, None
+    )
+
+    tasks = await controller._collect(produce)
+
+    assert sorted(t.filename for t in tasks) == ["a_2k.hdr", "b_2k.hdr"]
+
+    # -s limits the ladder, and without a fixed format each format is a rung of its own
+    produce = controller._metadata_producer(
+        client, ["a", "b"], "hdris", "/lib", ["1k", "2k"], False, True, False, None, None, None
+    )
+    tasks = await controller._collect(produce)
+
+    assert sorted(t.filename for t in tasks) == ["a_2k.hdr", "b_2k.hdr"]
+
+
+@pytest.mark.asyncio
+async def test_map_selection_ladder_skips_bundle_only_rungs():
+    def info(name, size):
+        return {"url": f"https://x/{name}", "md5": "m", "size": size}
+
+    files = {
+        "Diffuse": {"1k": {"jpg": info("t_diff_1k.jpg", 20), "png": info("t_diff_1k.png", 40)},
+                    "2k": {"jpg": info("t_diff_2k.jpg", 80)}},
+        "Rough": {"1k": {"exr": info("t_rough_1k.exr", 5)}},
+        "blend": {"2k": {"blend": info("t_2k.blend", 3)}},
+        "gltf": {"2k": {"gltf": info("t_2k.gltf", 1)}},
+    }
+    client = AsyncMock()
+    client.get_files.return_value = files
+    controller = PolydownController(max_bytes=50)
+    produce = controller._metadata_producer(
+        client, ["t"], "textures", "/lib", [], False, True, False, None, None, ["diffuse"]
+    )
+
+    tasks = await controller._collect(produce)
+
+    assert sorted(t.filename for t in tasks) == ["t_diff_1k.png"]
+    ladder = controller._size_ladder("textures", "t", files, "/lib", [], False, None, None, ["diffuse"])
+    assert [rung.label for rung in ladder] == ["1k jpg", "1k png", "2k jpg"]
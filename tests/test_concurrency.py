@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+from polydown.concurrency import AdaptiveLimiter
+
+@pytest.mark.asyncio
+async def test_limiter_blocks_beyond_limit():
+    limiter = AdaptiveLimiter(initial=1, maximum=4)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.release()
+    await asyncio.wait_for(waiter, timeout=1)
+    limiter.release()
+
+@pytest.mark.asyncio
+async def test_limiter_grows_when_saturated_and_halves_on_errors():
+    limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=8, interval=0)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    limiter.record_bytes(1000)
+    assert limiter.limit == 3
+
+    limiter.record_error(503)
+    assert limiter.limit == 1
+    assert limiter.peak_limit == 2
+
+def test_client_errors_are_not_congestion():
+    limiter = AdaptiveLimiter(initial=4, interval=0)
+    limiter.record_error(404)
+    assert limiter.limit == 4
@@ -0,0 +1,54 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from polydown.destindex import DestinationIndex
+from polydown.downloader import DownloadManager, DownloadTask
+from polydown.manifest import LibraryManifest
+
+def test_scan_indexes_nested_files(tmp_path):
+    nested = tmp_path / "a" / "a_1k" / "textures"
+    nested.mkdir(parents=True)
+    (nested / "a_diff_1k.jpg").write_bytes(b"x" * 10)
+    (tmp_path / "b.hdr").write_bytes(b"y" * 3)
+
+    index = DestinationIndex.scan(str(tmp_path))
+
+    assert index.stat(str(nested / "a_diff_1k.jpg"))[0] == 10
+    assert index.exists(str(tmp_path / "b.hdr"))
+    assert not index.exists(str(tmp_path / "missing.hdr"))
+    assert str(nested) in index.dirs
+    assert DestinationIndex.scan(str(tmp_path / "nope")).files == {}
+
+def test_make_dirs_batches_missing_folders(tmp_path):
+    index = DestinationIndex.scan(str(tmp_path))
+    folders = [str(tmp_path / "m" / f"m_{s}" / "textures") for s in ("1k", "2k")] + [str(tmp_path)]
+
+    missing = index.missing_dirs(folders)
+    assert missing == sorted(folders[:2])
+    index.make_dirs(missing)
+
+    assert all(os.path.isdir(f) for f in folders)
+    assert index.missing_dirs(folders) == []
+    assert str(tmp_path / "m") in index.dirs
+
+@pytest.mark.asyncio
+async def test_existing_files_are_skipped_from_the_index(tmp_path, monkeypatch):
+    (tmp_path / "a.hdr").write_bytes(b"data")
+    index = DestinationIndex.scan(str(tmp_path))
+    manifest = LibraryManifest(str(tmp_path))
+    manifest.record(str(tmp_path / "a.hdr"), "http://x/a.hdr", "md5")
+    session = MagicMock()
+    manager = DownloadManager(session, manifest=manifest, index=index)
+
+    def no_stat(*args, **kwargs):
+        raise AssertionError("stat call despite the index")
+
+    monkeypatch.setattr(os, "stat", no_stat)
+    monkeypatch.setattr(os.path, "exists", no_stat)
+    task = DownloadTask("http://x/a.hdr", str(tmp_path), "a.hdr", md5="md5")
+    assert await manager.download(task) == ("a.hdr", "exists", True)
+    monkeypatch.undo()
+
+    session.get.assert_not_called()
+    manager.close()
+    manifest.close()
@@ -1,9 +1,12 @@
+import aiohttp
 import pytest
 import os
 import tempfile
 import hashlib
 from unittest.mock import AsyncMock, MagicMock
 from polydown.downloader import DownloadManager, DownloadTask
+from polydown.manifest import LibraryManifest
+from polydown.store import BlobStore
 
 @pytest.mark.asyncio
 async def test_download_file_success():
@@ -108,3 +111,317 @@ async def test_md5_verification():
         )
         filename, status, verified = await manager.download(task2)
         assert verified is False
+
+@pytest.mark.asyncio
+async def test_download_resumes_part_file():
+    mock_session = MagicMock()
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status = 206
+    mock_response.headers = {'content-length': '7', 'ETag': '"abc"'}
+
+    async def async_iter(chunk_size):
+        yield b"content"
+
+    mock_response.content = MagicMock()
+    mock_response.content.iter_chunked.side_effect = async_iter
+
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    full = b"test content"
+    md5 = hashlib.md5(full).hexdigest()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        part_path = os.path.join(tmpdir, "file.txt.part")
+        with open(part_path, "wb") as f:
+            f.write(b"test ")
+        with open(part_path + ".validator", "w") as f:
+            f.write('"abc"')
+
+        manager = DownloadManager(mock_session)
+        task = DownloadTask(
+            url="http://example.com/file.txt",
+            destination_folder=tmpdir,
+            filename="file.txt",
+            md5=md5
+        )
+
+        filename, status, verified = await manager.download(task)
+
+        assert status == "downloaded"
+        assert verified is True
+        _, kwargs = mock_session.get.call_args
+        assert kwargs["headers"] == {"Range": "bytes=5-", "If-Range": '"abc"'}
+
+        with open(os.path.join(tmpdir, "file.txt"), "rb") as f:
+            assert f.read() == full
+        assert not os.path.exists(part_path)
+        assert not os.path.exists(part_path + ".validator")
+
+@pytest.mark.asyncio
+async def test_interrupted_part_file_holds_only_written_bytes():
+    mock_session = MagicMock()
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status = 200
+    mock_response.headers = {'content-length': str(100 * 1024 * 1024)}
+
+    sizes_while_streaming = []
+
+    async def async_iter(chunk_size):
+        # What a kill at this point would leave behind
+        sizes_while_streaming.append(os.path.getsize(os.path.join(tmpdir, "big.exr.part")))
+        yield b"x" * 1024
+        raise aiohttp.ClientPayloadError("connection lost")
+
+    mock_response.content = MagicMock()
+    mock_response.content.iter_chunked.side_effect = async_iter
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DownloadManager(mock_session)
+        task = DownloadTask(url="http://example.com/big.exr", destination_folder=tmpdir, filename="big.exr", md5="abc")
+
+        filename, status, verified = await manager.download(task)
+
+        assert status == "failed"
+        assert sizes_while_streaming == [0]
+        # The next attempt resumes from here
+        assert os.path.getsize(os.path.join(tmpdir, "big.exr.part")) == 1024
+
+@pytest.mark.asyncio
+async def test_segmented_download():
+    content = b"0123456789abcdefghij"
+    md5 = hashlib.md5(content).hexdigest()
+
+    def fake_get(url, headers=None):
+        start, end = (int(x) for x in headers["Range"][len("bytes="):].split("-"))
+        body = content[start:end + 1]
+
+        async def async_iter(chunk_size):
+            yield body
+
+        response = AsyncMock()
+        response.raise_for_status = MagicMock()
+        response.status = 206
+        response.headers = {'content-length': str(len(body))}
+        response.content = MagicMock()
+        response.content.iter_chunked.side_effect = async_iter
+
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=response)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        return ctx
+
+    mock_session = MagicMock()
+    mock_session.get.side_effect = fake_get
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DownloadManager(mock_session, segments=3, segment_threshold=10)
+        task = DownloadTask(
+            url="http://example.com/big.exr",
+            destination_folder=tmpdir,
+            filename="big.exr",
+            md5=md5,
+            size=len(content)
+        )
+
+        filename, status, verified = await manager.download(task)
+
+        assert status == "downloaded"
+        assert verified is True
+        assert mock_session.get.call_count == 3
+        with open(os.path.join(tmpdir, "big.exr"), "rb") as f:
+            assert f.read() == content
+
+@pytest.mark.asyncio
+async def test_segmented_download_falls_back_when_ranges_are_ignored():
+    content = b"0123456789abcdefghij"
+    requests = []
+
+    def fake_get(url, headers=None):
+        requests.append(headers)
+
+        async def async_iter(chunk_size):
+            yield content
+
+        # Every request gets the whole file
+        response = AsyncMock()
+        response.raise_for_status = MagicMock()
+        response.status = 200
+        response.headers = {'content-length': str(len(content))}
+        response.content = MagicMock()
+        response.content.iter_chunked.side_effect = async_iter
+
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=response)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        return ctx
+
+    mock_session = MagicMock()
+    mock_session.get.side_effect = fake_get
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DownloadManager(mock_session, segments=3, segment_threshold=10)
+        task = DownloadTask(
+            url="http://example.com/big.exr",
+            destination_folder=tmpdir,
+            filename="big.exr",
+            md5=hashlib.md5(content).hexdigest(),
+            size=len(content)
+        )
+
+        filename, status, verified = await manager.download(task)
+
+        assert status == "downloaded"
+        assert verified is True
+        # The last request is the plain single-stream GET
+        assert requests[-1] is None
+        with open(os.path.join(tmpdir, "big.exr"), "rb") as f:
+            assert f.read() == content
+
+@pytest.mark.asyncio
+async def test_unknown_size_is_not_probed():
+    mock_session = MagicMock()
+    mock_session.head.side_effect = AssertionError("no HEAD expected")
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status = 200
+    mock_response.headers = {'content-length': '7'}
+
+    async def async_iter(chunk_size):
+        yield b"preview"
+
+    mock_response.content = MagicMock()
+    mock_response.content.iter_chunked.side_effect = async_iter
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DownloadManager(mock_session, segments=4, segment_threshold=1)
+        task = DownloadTask(url="http://example.com/preview.png", destination_folder=tmpdir, filename="preview.png")
+
+        filename, status, verified = await manager.download(task)
+
+        assert status == "downloaded"
+        mock_session.head.assert_not_called()
+        assert mock_session.get.call_count == 1
+
+@pytest.mark.asyncio
+async def test_md5_computed_while_streaming():
+    mock_session = MagicMock()
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    content = b"test content"
+    mock_response.headers = {'content-length': str(len(content))}
+
+    async def async_iter(chunk_size):
+        yield content[:4]
+        yield content[4:]
+
+    mock_response.content = MagicMock()
+    mock_response.content.iter_chunked.side_effect = async_iter
+
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DownloadManager(mock_session)
+        manager.verify_md5 = AsyncMock()
+        task = DownloadTask(
+            url="http://example.com/file.txt",
+            destination_folder=tmpdir,
+            filename="file.txt",
+            md5=hashlib.md5(content).hexdigest()
+        )
+
+        filename, status, verified = await manager.download(task)
+
+        assert verified is True
+        # No second pass over the written file
+        manager.verify_md5.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_manifest_skips_rehash_of_verified_file():
+    mock_session = MagicMock()
+    content = b"existing content"
+    md5 = hashlib.md5(content).hexdigest()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = os.path.join(tmpdir, "existing.txt")
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+        manifest = LibraryManifest(tmpdir)
+        manager = DownloadManager(mock_session, manifest=manifest)
+        task = DownloadTask(
+            url="http://example.com/existing.txt",
+            destination_folder=tmpdir,
+            filename="existing.txt",
+            md5=md5
+        )
+
+        # First run hashes the file and records it
+        _, status, verified = await manager.download(task)
+        assert status == "exists" and verified is True
+        assert manifest.lookup(file_path).md5 == md5
+
+        # Second run trusts the manifest
+        manager.verify_md5 = AsyncMock()
+        _, status, verified = await manager.download(task)
+        assert status == "exists" and verified is True
+        manager.verify_md5.assert_not_called()
+        manifest.close()
+
+@pytest.mark.asyncio
+async def test_deep_verify_rehashes_and_refreshes_manifest():
+    content = b"existing content"
+    md5 = hashlib.md5(content).hexdigest()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = os.path.join(tmpdir, "existing.txt")
+        with open(file_path, "wb") as f:
+            f.write(content)
+        task = DownloadTask(url="http://example.com/existing.txt", destination_folder=tmpdir,
+                            filename="existing.txt", md5=md5)
+
+        manifest = LibraryManifest(tmpdir)
+        manifest.record(file_path, task.url, md5)
+        recorded_at = manifest.lookup(file_path).verified_at
+
+        manager = DownloadManager(MagicMock(), manifest=manifest, deep_verify=True)
+        manager.verify_md5 = AsyncMock(return_value=True)
+        _, status, verified = await manager.download(task)
+
+        assert status == "exists" and verified is True
+        manager.verify_md5.assert_awaited_once()
+        assert manifest.lookup(file_path).verified_at > recorded_at
+        manager.close()
+        manifest.close()
+
+@pytest.mark.asyncio
+async def test_store_hit_links_without_network():
+    mock_session = MagicMock()
+    content = b"shared texture"
+    md5 = hashlib.md5(content).hexdigest()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = BlobStore(os.path.join(tmpdir, "store"))
+        source = os.path.join(tmpdir, "source.jpg")
+        with open(source, "wb") as f:
+            f.write(content)
+        store.add(source, md5)
+
+        manager = DownloadManager(mock_session, store=store)
+        task = DownloadTask(
+            url="http://example.com/tex.jpg",
+            destination_folder=os.path.join(tmpdir, "asset_1k", "textures"),
+            filename="tex.jpg",
+            md5=md5
+        )
+
+        filename, status, verified = await manager.download(task)
+
+        assert status == "linked"
+        assert verified is True
+        mock_session.get.assert_not_called()
+        linked = os.path.join(task.destination_folder, "tex.jpg")
+        assert os.path.samefile(linked, store.path_for(md5))
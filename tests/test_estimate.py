@@ -0,0 +1,63 @@
+import json
+import os
+import pytest
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import BODY_BLOCK, MockConfig, MockPolyHaven
+from polydown.controller import PolydownController
+from polydown.downloader import DownloadTask
+from polydown.estimate import STATS_FILENAME, classify, load_throughput, record_throughput
+
+
+def test_classify_poly_haven_file_names():
+    def task(filename, md5="m", size=1):
+        return DownloadTask("u", "/lib", filename, md5=md5, size=size)
+
+    assert classify("old_depot", task("old_depot_4k.exr")) == ("4k", "exr", "-")
+    assert classify("rock_02", task("rock_02_nor_gl_2k.png")) == ("2k", "png", "nor_gl")
+    assert classify("rock_02", task("rock_02_primary.png", md5=None, size=None)) == ("-", "png", "preview")
+    assert classify("rock_02", task("other_1k.jpg")) == ("1k", "jpg", "-")
+
+
+def test_throughput_round_trip(tmp_path):
+    assert load_throughput(str(tmp_path)) is None
+    record_throughput(str(tmp_path), 10_000_000, 2.0)
+    assert load_throughput(str(tmp_path)) == 5_000_000
+
+
+@pytest.mark.asyncio
+async def test_recorded_throughput_covers_only_this_runs_transfers(tmp_path):
+    library = str(tmp_path)
+    config = MockConfig(assets=2, sizes=["1k"], file_size=32 * 1024, api_latency=0.2)
+    # Half of one file is left from an earlier run
+    with open(os.path.join(library, "asset_00000_1k.hdr.part"), "wb") as f:
+        f.write(BODY_BLOCK[:16 * 1024])
+
+    result = await run_benchmark(config, folder=library, controller_options={"metadata_concurrency": 1})
+
+    with open(os.path.join(library, STATS_FILENAME)) as f:
+        stats = json.load(f)
+    assert stats["bytes"] == 2 * 32 * 1024 - 16 * 1024
+    # Metadata requests took most of the run, the transfers almost none of it
+    assert result.seconds > 0.6
+    assert stats["seconds"] < 0.2
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_breakdown_present_files_and_eta(tmp_path):
+    library = str(tmp_path)
+    config = MockConfig(assets=2, sizes=["1k", "2k"], file_size=32 * 1024)
+    with open(os.path.join(library, "asset_00000_1k.hdr"), "wb") as f:
+        f.write(b"\0" * 32 * 1024)
+
+    async with MockPolyHaven(config) as server:
+        controller = PolydownController(api_base_url=server.base_url, progress="none", concurrency=2)
+        estimate = await controller.estimate(
+            "hdris", None, library, [], False, True, None, False, "hdr", probe_seconds=1,
+        )
+
+    assert (estimate.total.files, estimate.total.bytes) == (4, 4 * 32 * 1024)
+    assert (estimate.present.files, estimate.present.bytes) == (1, 32 * 1024)
+    assert {k: v.files for k, v in estimate.breakdown["size"].items()} == {"1k": 2, "2k": 2}
+    assert set(estimate.breakdown["format"]) == {"hdr"}
+    # Nothing was written to the library, and the probe fetched the largest files
+    assert sorted(os.listdir(library)) == ["asset_00000_1k.hdr"]
+    assert server.requests["dl"] == 2
@@ -0,0 +1,50 @@
+import asyncio
+import types
+import pytest
+from unittest.mock import AsyncMock
+from polydown.controller import PolydownController
+from polydown.downloader import DownloadTask
+
+MODEL_FILES = {
+    "blend": {
+        "1k": {"blend": {
+            "url": "https://dl.polyhaven.org/m_1k.blend", "md5": "b", "size": 10,
+            "include": {"textures/m_diff_1k.jpg": {"url": "https://dl.polyhaven.org/m_diff_1k.jpg", "md5": "d", "size": 5}},
+        }},
+    },
+}
+
+def test_task_generation_is_lazy():
+    controller = PolydownController()
+    tasks = controller._generate_tasks("models", "m", MODEL_FILES, "/lib", [], False, True, False, None)
+
+    assert isinstance(tasks, types.GeneratorType)
+    assert [(t.filename, t.size) for t in tasks] == [("m_1k.blend", 10), ("m_diff_1k.jpg", 5)]
+    assert not hasattr(DownloadTask("u", "/lib", "f"), "__dict__")
+
+@pytest.mark.asyncio
+async def test_metadata_fetching_stops_when_consumer_stalls():
+    controller = PolydownController(metadata_concurrency=4)
+    client = AsyncMock()
+    client.get_files.return_value = {"hdri": {"1k": {"hdr": {"url": "https://x/a_1k.hdr", "md5": "m", "size": 1}}}}
+    assets = [f"a{i}" for i in range(1000)]
+    produce = controller._metadata_producer(
+        client, assets, "hdris", "/lib", [], False, True, False, "hdr", None, None
+    )
+
+    received = []
+    stalled = asyncio.Event()
+
+    async def put(task):
+        received.append(task)
+        if len(received) >= 10:
+            stalled.set()
+            await asyncio.Event().wait()
+
+    producer = asyncio.create_task(produce(put))
+    await stalled.wait()
+    await asyncio.sleep(0.05)
+    producer.cancel()
+
+    # Only the fetchers that are blocked on put have fetched beyond what was consumed
+    assert client.get_files.await_count <= 10 + 4
@@ -0,0 +1,59 @@
+import json
+import pytest
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import MockConfig
+from polydown.metrics import Histogram, RunMetrics
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value)
+
+    assert hist.counts == [1, 2]
+    assert hist.count == 3
+    assert hist.sum == pytest.approx(5.55)
+
+def test_metrics_exports(tmp_path):
+    metrics = RunMetrics(per_file=True)
+    with metrics.phase("download"):
+        pass
+    metrics.observe_request("cdn.polyhaven.com", "ttfb", 0.02)
+    metrics.record_file("a.hdr", "https://x/a.hdr", "downloaded", 2_000_000, 2.0, retries=1)
+
+    metrics.write_json(str(tmp_path / "run.json"))
+    metrics.write_prometheus(str(tmp_path / "run.prom"))
+
+    report = json.loads((tmp_path / "run.json").read_text())
+    assert "download" in report["phases"]
+    assert report["files"][0]["throughput"] == 1_000_000
+    assert report["totals"] == {"files": 1, "bytes": 2_000_000, "retries": 1, "status": {"downloaded": 1}}
+
+    prom = (tmp_path / "run.prom").read_text()
+    assert 'polydown_files{status="downloaded"} 1' in prom
+    assert 'polydown_request_seconds_bucket{host="cdn.polyhaven.com",stage="ttfb",le="0.025"} 1' in prom
+    assert 'polydown_request_seconds_count{host="cdn.polyhaven.com",stage="ttfb"} 1' in prom
+
+def test_metrics_keep_totals_without_per_file_records():
+    metrics = RunMetrics()
+    metrics.record_file("a.hdr", "https://x/a.hdr", "downloaded", 100, 1.0, retries=2)
+    metrics.record_file("b.hdr", "https://x/b.hdr", "failed", 0, 1.0)
+    worker = RunMetrics()
+    worker.record_file("c.hdr", "https://x/c.hdr", "downloaded", 50, 1.0)
+    metrics.merge(worker)
+
+    assert metrics.files == []
+    assert (metrics.file_count, metrics.bytes, metrics.retries) == (3, 150, 2)
+    assert metrics.status_counts() == {"downloaded": 2, "failed": 1}
+
+@pytest.mark.asyncio
+async def test_controller_records_phases_requests_and_files(tmp_path):
+    metrics = RunMetrics(per_file=True)
+    config = MockConfig(assets=2, sizes=["1k"], file_size=64 * 1024)
+
+    await run_benchmark(config, folder=str(tmp_path), controller_options={"metrics": metrics})
+
+    assert {"asset_list", "metadata", "download"} <= set(metrics.phases)
+    assert ("127.0.0.1", "ttfb") in metrics.requests
+    assert ("127.0.0.1", "connect") in metrics.requests
+    assert sorted(f.filename for f in metrics.files) == ["asset_00000_1k.hdr", "asset_00001_1k.hdr"]
+    assert all(f.bytes == 64 * 1024 and f.status == "downloaded" for f in metrics.files)
@@ -0,0 +1,63 @@
+import os
+import pytest
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import MockConfig, MockPolyHaven
+from polydown.controller import PolydownController
+from polydown.metrics import RunMetrics
+from polydown.retry import RetryPolicy
+from polydown.tasklist import read_task_list
+
+
+@pytest.mark.asyncio
+async def test_download_processes_share_one_summary(tmp_path):
+    config = MockConfig(assets=4, sizes=["1k", "2k"], file_size=128 * 1024)
+    metrics = RunMetrics()
+
+    result = await run_benchmark(
+        config,
+        folder=str(tmp_path),
+        controller_options={"concurrency": 2, "processes": 2, "metrics": metrics},
+    )
+
+    assert result.files == 8
+    downloaded = sorted(f for f in os.listdir(tmp_path) if f.endswith(".hdr"))
+    assert downloaded == sorted(f"asset_{i:05d}_{s}.hdr" for i in range(4) for s in ["1k", "2k"])
+    # File totals come back from the worker processes
+    assert metrics.status_counts() == {"downloaded": 8}
+    assert metrics.bytes == 8 * 128 * 1024
+
+
+@pytest.mark.asyncio
+async def test_download_processes_retry_inside_worker(tmp_path):
+    config = MockConfig(assets=2, sizes=["1k"], file_size=64 * 1024, fail_first=1)
+    metrics = RunMetrics()
+
+    result = await run_benchmark(
+        config,
+        folder=str(tmp_path),
+        controller_options={
+            "concurrency": 1, "processes": 2, "metrics": metrics, "retry": RetryPolicy(base_delay=0),
+        },
+    )
+
+    assert result.files == 2
+    assert sorted(f for f in os.listdir(tmp_path) if f.endswith(".hdr")) == ["asset_00000_1k.hdr", "asset_00001_1k.hdr"]
+    assert metrics.status_counts() == {"downloaded": 2}
+    assert metrics.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_tasks_of_a_crashed_process_are_reported_failed(tmp_path):
+    library = str(tmp_path / "lib")
+    failed_path = tmp_path / "failed.jsonl"
+    config = MockConfig(assets=3, sizes=["1k", "2k"], file_size=16 * 1024)
+
+    async with MockPolyHaven(config) as server:
+        controller = PolydownController(
+            api_base_url=server.base_url, progress="none", processes=2, failed_output=str(failed_path),
+        )
+        # Every worker process fails while building its controller
+        controller._process_options = lambda: {"unknown_option": True}
+        await controller.start("hdris", None, library, [], True, True, None, False, "hdr")
+
+    assert len(read_task_list(str(failed_path), root=library)) == 6
@@ -0,0 +1,63 @@
+import dataclasses
+import os
+import pytest
+from benchmarks.mock_server import MockConfig, MockPolyHaven
+from polydown.controller import PolydownController
+from polydown.downloader import DownloadTask
+from polydown.estimate import STATS_FILENAME
+from polydown.tasklist import PlanCheckpoint, plan_record, read_task_list, write_task_list
+
+@pytest.mark.asyncio
+async def test_plan_then_apply_with_checkpoint(tmp_path):
+    plan_path = str(tmp_path / "plan.jsonl")
+    library = str(tmp_path / "elsewhere")
+
+    async with MockPolyHaven(MockConfig(assets=2, sizes=["1k", "2k"], file_size=32 * 1024)) as server:
+        planner = PolydownController(api_base_url=server.base_url, progress="none")
+        tasks = await planner.plan("hdris", None, "/planning/root", [], False, True, None, False, "hdr")
+        write_task_list(plan_path, [plan_record(task, "/planning/root") for task in tasks])
+        assert server.files_served == set()
+
+        # Destinations are resolved against the library the plan is applied to
+        planned = read_task_list(plan_path, root=library)
+        assert {t.destination_folder for t in planned} == {library}
+        assert all(t.md5 and t.size == 32 * 1024 for t in planned)
+
+        api_requests = dict(server.requests)
+        checkpoint = PlanCheckpoint(plan_path + ".done")
+        await PolydownController(progress="none").apply(planned, library, checkpoint)
+        checkpoint.close()
+
+        assert server.requests.get("files") == api_requests.get("files")
+        assert server.requests["dl"] == 4
+        assert sorted(os.listdir(library)) == sorted([".polydown.sqlite", STATS_FILENAME] + [t.filename for t in planned])
+
+        # A completed plan leaves no checkpoint behind
+        assert not os.path.exists(plan_path + ".done")
+
+        # An interrupted apply resumes after the entries it completed
+        os.remove(os.path.join(library, planned[0].filename))
+        checkpoint = PlanCheckpoint(plan_path + ".done")
+        for task in planned[1:]:
+            checkpoint.mark(task)
+        await PolydownController(progress="none").apply(planned, library, checkpoint)
+        checkpoint.close()
+        assert server.requests["dl"] == 5
+
+def test_checkpoint_is_keyed_on_content_and_plan(tmp_path):
+    path = str(tmp_path / "plan.jsonl.done")
+    task = DownloadTask(url="http://x/a_1k.hdr", destination_folder="/lib", filename="a_1k.hdr", md5="old")
+    checkpoint = PlanCheckpoint(path, plan_digest="first")
+    checkpoint.mark(task)
+    checkpoint.close()
+
+    checkpoint = PlanCheckpoint(path, plan_digest="first")
+    assert task in checkpoint
+    # Re-published at the same path
+    assert dataclasses.replace(task, md5="new") not in checkpoint
+    checkpoint.close()
+
+    # The plan file changed, e.g. a later failed list: start over
+    checkpoint = PlanCheckpoint(path, plan_digest="second")
+    assert task not in checkpoint
+    checkpoint.close()
@@ -0,0 +1,64 @@
+import io
+import json
+import pytest
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import MockConfig, MockPolyHaven
+from polydown import controller as controller_module
+from polydown.downloader import DownloadTask
+from polydown.progress import JsonLinesProgressReporter, ProgressReporter
+
+def test_jsonl_reporter_aggregates_chunks():
+    stream = io.StringIO()
+    reporter = JsonLinesProgressReporter(worker_count=2, stream=stream, interval=3600)
+    task = DownloadTask(url="http://x/a.hdr", destination_folder="/tmp", filename="a.hdr", size=8192 * 100)
+
+    reporter.file_started(0, task)
+    for _ in range(100):
+        reporter.advance(0, 8192, task.size)
+    reporter.file_finished(0, task, "downloaded", True)
+    reporter.summary({"downloaded": 1, "failed": 0})
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    # No per-chunk events, the bytes are folded into the summary
+    assert [e["event"] for e in events] == ["start", "finish", "summary"]
+    assert events[-1]["bytes"] == 8192 * 100
+    assert events[-1]["downloaded"] == 1
+
+def test_jsonl_reporter_publishes_at_interval():
+    stream = io.StringIO()
+    reporter = JsonLinesProgressReporter(worker_count=1, stream=stream, interval=0)
+
+    reporter.advance(0, 100, 200)
+    reporter.advance(0, 100, 200)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e["bytes"] for e in events] == [100, 200]
+
+@pytest.mark.asyncio
+async def test_downloads_start_while_metadata_is_fetched(tmp_path, monkeypatch):
+    config = MockConfig(assets=6, sizes=["1k"], file_size=64 * 1024, api_latency=0.05)
+    discovered = []
+    files_fetched_at_start = []
+
+    async with MockPolyHaven(config) as server:
+        class RecordingReporter(ProgressReporter):
+            def discovered(self, total, done=False):
+                discovered.append(total)
+
+            def file_started(self, worker_id, task):
+                files_fetched_at_start.append(server.requests.get("files", 0))
+
+        monkeypatch.setattr(controller_module, "create_reporter", lambda mode, workers, console: RecordingReporter(workers))
+        result = await run_benchmark(
+            config,
+            folder=str(tmp_path),
+            controller_options={"metadata_concurrency": 1},
+            base_url=server.base_url,
+        )
+
+    assert result.files == 6
+    # The first transfer began before the last /files response was requested
+    assert files_fetched_at_start[0] < config.assets
+    # The total grows one discovered task at a time, then is confirmed once complete
+    assert discovered[:-1] == list(range(1, 7))
+    assert discovered[-1] == 6
@@ -0,0 +1,68 @@
+import aiohttp
+import pytest
+from unittest.mock import MagicMock
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import MockConfig
+from polydown.metrics import RunMetrics
+from polydown.retry import RetryPolicy, retry_after_seconds
+from polydown.tasklist import read_task_list
+
+def _error(status, headers=None):
+    return aiohttp.ClientResponseError(MagicMock(), (), status=status, headers=headers)
+
+@pytest.mark.asyncio
+async def test_retry_policy_retries_transient_errors_only():
+    policy = RetryPolicy(attempts=3, base_delay=0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _error(503)
+        return "ok"
+
+    assert await policy.call(flaky) == "ok"
+    assert len(calls) == 3
+
+    async def missing():
+        calls.append(1)
+        raise _error(404)
+
+    calls.clear()
+    with pytest.raises(aiohttp.ClientResponseError):
+        await policy.call(missing)
+    assert len(calls) == 1
+
+def test_retry_delay_backoff_and_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0, jitter=0.0)
+    assert [policy.delay(n) for n in (1, 2, 3, 4, 5)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+    assert policy.delay(1, _error(429, {"Retry-After": "30"})) == 30.0
+    assert retry_after_seconds(_error(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+
+    jittered = RetryPolicy(base_delay=4.0, jitter=0.5)
+    assert all(2.0 <= jittered.delay(1) <= 4.0 for _ in range(50))
+
+@pytest.mark.asyncio
+async def test_failed_downloads_are_requeued(tmp_path):
+    metrics = RunMetrics(per_file=True)
+    config = MockConfig(assets=2, sizes=["1k"], file_size=64 * 1024, fail_first=2)
+    options = {"metrics": metrics, "retry": RetryPolicy(attempts=3, base_delay=0)}
+
+    result = await run_benchmark(config, folder=str(tmp_path), controller_options=options)
+
+    assert result.files == 2
+    assert sorted(f.retries for f in metrics.files) == [2, 2]
+    assert all(f.status == "downloaded" for f in metrics.files)
+    assert not (tmp_path / ".polydown-failed.jsonl").exists()
+
+@pytest.mark.asyncio
+async def test_permanent_failures_are_written_as_task_list(tmp_path):
+    failed_path = tmp_path / "failed.jsonl"
+    config = MockConfig(assets=2, sizes=["1k"], file_size=64 * 1024, fail_first=5)
+    options = {"retry": RetryPolicy(attempts=2, base_delay=0), "failed_output": str(failed_path)}
+
+    await run_benchmark(config, folder=str(tmp_path / "lib"), controller_options=options)
+
+    tasks = read_task_list(str(failed_path))
+    assert sorted(t.filename for t in tasks) == ["asset_00000_1k.hdr", "asset_00001_1k.hdr"]
+    assert all(t.md5 and t.size == 64 * 1024 for t in tasks)
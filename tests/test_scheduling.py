@@ -0,0 +1,33 @@
+import pytest
+from polydown.downloader import DownloadTask
+from polydown.scheduling import ScheduledQueue
+
+def _task(name, size):
+    return DownloadTask(url=f"http://x/{name}", destination_folder="/tmp", filename=name, size=size)
+
+async def _drain(queue):
+    names = []
+    while True:
+        task = await queue.get()
+        if task is None:
+            return names
+        names.append(task.filename)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy, expected", [
+    ("fifo", ["b", "a", "c", "img"]),
+    ("largest", ["c", "b", "a", "img"]),
+    ("smallest", ["img", "a", "b", "c"]),
+    ("interleaved", ["c", "img", "b", "a"]),
+])
+async def test_scheduling_policies(policy, expected):
+    queue = ScheduledQueue(policy)
+    for task in [_task("b", 20), _task("a", 10), _task("c", 30), _task("img", None)]:
+        queue.put_nowait(task)
+    queue.put_nowait(None)
+
+    assert await _drain(queue) == expected
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        ScheduledQueue("random")
@@ -0,0 +1,15 @@
+import pytest
+from polydown.session import SessionPool
+
+@pytest.mark.asyncio
+async def test_session_pool_isolates_hosts():
+    async with SessionPool(host_limits={"api.polyhaven.com": 3}, default_limit=5) as pool:
+        api = pool.session_for("https://api.polyhaven.com/types")
+        cdn = pool.session_for("https://cdn.polyhaven.com/asset_img/thumbs/a.png")
+
+        assert api is pool.session_for("https://api.polyhaven.com/files/a")
+        assert api is not cdn
+        assert api.connector.limit == 3
+        assert cdn.connector.limit == 5
+
+    assert api.closed and cdn.closed
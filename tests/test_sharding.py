@@ -0,0 +1,45 @@
+import json
+import pytest
+from benchmarks.bench_download import run_benchmark
+from benchmarks.mock_server import MockConfig
+from polydown.downloader import DownloadTask
+from polydown.sharding import parse_shard, shard_assets, shard_tasks
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("0/4", "5/4", "2", "a/b", "1/0"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+def test_asset_shards_cover_catalogue_once_and_ignore_order():
+    assets = [f"asset_{i}" for i in range(200)]
+    shards = [shard_assets(assets, i, 3) for i in (1, 2, 3)]
+
+    assert sorted(a for shard in shards for a in shard) == sorted(assets)
+    assert all(shard for shard in shards)
+    assert shard_assets(list(reversed(assets)), 2, 3) == list(reversed(shards[1]))
+
+def test_byte_shards_are_balanced():
+    tasks = [DownloadTask(f"u{i}", "/lib", f"f{i}", size=(i % 7 + 1) * 1000) for i in range(100)]
+    tasks += [DownloadTask(f"p{i}", "/lib", f"p{i}.png") for i in range(10)]
+    shards = [shard_tasks(tasks, i, 4) for i in (1, 2, 3, 4)]
+
+    assert sorted(t.filename for shard in shards for t in shard) == sorted(t.filename for t in tasks)
+    loads = [sum(t.size or 0 for t in shard) for shard in shards]
+    assert max(loads) - min(loads) <= 7000
+
+@pytest.mark.asyncio
+async def test_shards_write_summaries(tmp_path):
+    config = MockConfig(assets=6, sizes=["1k"], file_size=16 * 1024)
+    served = 0
+    for index in (1, 2):
+        options = {"shard": (index, 2), "shard_by": "bytes"}
+        result = await run_benchmark(config, folder=str(tmp_path), controller_options=options)
+        served += result.files
+
+        summary = json.loads((tmp_path / f".polydown-shard-{index}-of-2.json").read_text())
+        assert summary["shard"] == index and summary["shards"] == 2
+        assert summary["transferred_bytes"] == result.bytes
+        assert summary["results"]["downloaded"] == result.files
+
+    assert served == 6
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import time
+import pytest
+from polydown.__main__ import build_parser, main
+
+HEAVY_MODULES = ("aiohttp", "rich", "polydown.cli", "polydown.controller")
+
+def _run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+def test_main_takes_argv():
+    with pytest.raises(SystemExit) as exc:
+        main(["--version"])
+    assert exc.value.code == 0
+    assert main([]) == 0
+
+    args = build_parser().parse_args(["sync", "hdris", "-s", "1k", "--shard", "1/2"])
+    assert args.asset_type == ["sync", "hdris"] and args.sizes == ["1k"]
+
+def test_version_and_help_skip_heavy_imports():
+    code = (
+        "import sys\n"
+        "from polydown.__main__ import main\n"
+        "for argv in (['--version'], ['--help']):\n"
+        "    try:\n"
+        "        main(argv)\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    assert _run(code).strip().splitlines()[-1] == "loaded:"
+
+def test_startup_time_budget():
+    # Interpreter start plus argument parsing; the download engine alone takes several times this
+    best = min(
+        _timed([sys.executable, "-m", "polydown", "--version"])
+        for _ in range(3)
+    )
+    baseline = min(_timed([sys.executable, "-c", "pass"]) for _ in range(3))
+    assert best - baseline < 0.2
+
+def _timed(cmd) -> float:
+    started = time.perf_counter()
+    subprocess.run(cmd, capture_output=True, check=True)
+    return time.perf_counter() - started
@@ -0,0 +1,106 @@
+import pytest
+import os
+import hashlib
+import threading
+from polydown.downloader import DownloadTask
+from polydown.manifest import LibraryManifest
+from unittest.mock import AsyncMock
+from polydown.controller import PolydownController
+from polydown.sync import Catalogue, plan_sync
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+@pytest.mark.asyncio
+async def test_plan_sync_classifies_files(tmp_path):
+    root = str(tmp_path)
+    _write(os.path.join(root, "same.hdr"), b"same")
+    _write(os.path.join(root, "old.hdr"), b"old")
+
+    tasks = [
+        DownloadTask(url="http://x/same.hdr", destination_folder=root, filename="same.hdr",
+                     md5=hashlib.md5(b"same").hexdigest(), size=4),
+        DownloadTask(url="http://x/old.hdr", destination_folder=root, filename="old.hdr",
+                     md5=hashlib.md5(b"new!").hexdigest(), size=4),
+        DownloadTask(url="http://x/fresh.hdr", destination_folder=root, filename="fresh.hdr",
+                     md5="abc", size=10),
+    ]
+
+    manifest = LibraryManifest(root)
+    plan = await plan_sync(tasks, manifest)
+
+    assert [t.filename for t in plan.new] == ["fresh.hdr"]
+    assert [t.filename for t in plan.changed] == ["old.hdr"]
+    assert plan.changed[0].overwrite is True
+    assert [t.filename for t in plan.unchanged] == ["same.hdr"]
+    assert plan.new_bytes == 10 and plan.changed_bytes == 4
+    # Verified files are recorded so the next sync does not rehash them
+    assert manifest.is_current(os.path.join(root, "same.hdr"), tasks[0].md5)
+    manifest.close()
+
+@pytest.mark.asyncio
+async def test_plan_sync_keeps_manifest_calls_off_the_event_loop(tmp_path):
+    root = str(tmp_path)
+    _write(os.path.join(root, "same.hdr"), b"same")
+    manifest = LibraryManifest(root)
+    loop_thread = threading.current_thread()
+    threads = []
+    for name in ("lookup", "is_current", "record", "entries"):
+        def traced(*args, _method=getattr(manifest, name), **kwargs):
+            threads.append(threading.current_thread())
+            return _method(*args, **kwargs)
+        setattr(manifest, name, traced)
+
+    task = DownloadTask(url="http://x/same.hdr", destination_folder=root, filename="same.hdr",
+                        md5=hashlib.md5(b"same").hexdigest(), size=4)
+    await plan_sync([task], manifest)
+    await plan_sync([task], manifest, catalogue=Catalogue(urls={task.url}))
+    manifest.close()
+
+    assert threads
+    assert loop_thread not in threads
+
+@pytest.mark.asyncio
+async def test_plan_sync_prunes_only_tracked_files(tmp_path):
+    root = str(tmp_path)
+    gone = os.path.join(root, "gone.hdr")
+    untracked = os.path.join(root, "mine.txt")
+    _write(gone, b"gone")
+    _write(untracked, b"mine")
+
+    kept = os.path.join(root, "a_2k.hdr")
+    other_type = os.path.join(root, "rock", "rock_diff_1k.jpg")
+    for path in (kept, other_type):
+        _write(path, b"x")
+
+    manifest = LibraryManifest(root)
+    manifest.record(gone, "http://x/gone.hdr", hashlib.md5(b"gone").hexdigest())
+    manifest.record(kept, "http://x/a_2k.hdr", None)
+    manifest.record(other_type, "http://x/rock_diff_1k.jpg", None)
+
+    # Nothing selected, but only what left the catalogue goes; "rock" is a texture
+    catalogue = Catalogue(urls={"http://x/a_2k.hdr"}, other_assets={"rock"})
+    plan = await plan_sync([], manifest, catalogue=catalogue)
+
+    assert plan.prune == [gone]
+    assert (await plan_sync([], manifest)).prune == []
+    manifest.close()
+
+@pytest.mark.asyncio
+async def test_catalogue_is_unfiltered_and_all_or_nothing():
+    client = AsyncMock()
+    client.get_asset_types.return_value = ["hdris", "textures"]
+    client.get_assets.side_effect = lambda t, c=None: {"hdris": ["a", "b"], "textures": ["rock"]}[t]
+    client.get_files.side_effect = lambda a: {"hdri": {"1k": {"hdr": {"url": f"http://x/{a}_1k.hdr"}},
+                                                       "8k": {"exr": {"url": f"http://x/{a}_8k.exr"}}}}
+    controller = PolydownController()
+
+    catalogue = await controller._fetch_catalogue(client, "hdris")
+
+    assert {"http://x/a_1k.hdr", "http://x/b_8k.exr", "https://cdn.polyhaven.com/asset_img/thumbs/a.png"} <= catalogue.urls
+    assert catalogue.other_assets == {"rock"}
+
+    client.get_files.side_effect = [{"hdri": {}}, OSError("502")]
+    assert await controller._fetch_catalogue(client, "hdris") is None
@@ -0,0 +1,52 @@
+import hashlib
+import os
+import pytest
+from polydown.downloader import DownloadTask
+from polydown.verify import md5_of_file, verify_library
+
+def test_md5_of_file_matches_hashlib(tmp_path):
+    data = os.urandom(3 * 1024 + 7)
+    path = tmp_path / "blob.bin"
+    path.write_bytes(data)
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+
+    assert md5_of_file(str(path), block_size=1024) == hashlib.md5(data).hexdigest()
+    assert md5_of_file(str(empty)) == hashlib.md5(b"").hexdigest()
+
+@pytest.mark.asyncio
+async def test_verify_library_report(tmp_path):
+    root = str(tmp_path)
+    (tmp_path / "good.hdr").write_bytes(b"good")
+    (tmp_path / "bad.hdr").write_bytes(b"bad")
+    (tmp_path / "stray.txt").write_bytes(b"stray")
+    (tmp_path / "partial.hdr.part").write_bytes(b"p")
+
+    def task(name, content):
+        return DownloadTask(url=f"http://x/{name}", destination_folder=root, filename=name,
+                            md5=hashlib.md5(content).hexdigest())
+
+    tasks = [task("good.hdr", b"good"), task("bad.hdr", b"good"), task("gone.hdr", b"gone")]
+    report = await verify_library(tasks, root, processes=2)
+
+    names = lambda paths: [os.path.basename(p) for p in paths]
+    assert names(report.ok) == ["good.hdr"]
+    assert names(report.corrupt) == ["bad.hdr"]
+    assert names(report.missing) == ["gone.hdr"]
+    assert names(report.extra) == ["stray.txt"]
+    assert not report.healthy
+
+@pytest.mark.asyncio
+async def test_extra_is_limited_to_the_selection(tmp_path):
+    root = str(tmp_path)
+    for name in ["old_depot_2k.hdr", "old_depot_4k.hdr", "old_depot_2k.exr", "night_2k.hdr"]:
+        (tmp_path / name).write_bytes(b"x")
+    # A textures asset sharing the root
+    (tmp_path / "rock_02").mkdir()
+    (tmp_path / "rock_02" / "rock_02_diff_2k.hdr").write_bytes(b"x")
+
+    tasks = [DownloadTask(url="http://x/old_depot_2k.hdr", destination_folder=root, filename="old_depot_2k.hdr")]
+    report = await verify_library(tasks, root, processes=1, assets={"old_depot", "night"}, sizes={"2k"})
+
+    # Other sizes, formats and asset types are outside the selection
+    assert [os.path.basename(p) for p in report.extra] == ["night_2k.hdr"]
@@ -0,0 +1,30 @@
+import pytest
+from polydown.writer import DiskWriter
+
+@pytest.mark.asyncio
+async def test_sink_coalesces_and_trims_preallocation(tmp_path):
+    path = str(tmp_path / "file.bin")
+    writer = DiskWriter(buffer_size=10, max_pending=2)
+
+    sink = await writer.open(path, preallocate=1000, trim=True)
+    async with sink:
+        for i in range(7):
+            await sink.write(bytes([65 + i]) * 4)
+
+    with open(path, "rb") as f:
+        assert f.read() == b"".join(bytes([65 + i]) * 4 for i in range(7))
+    writer.shutdown()
+
+@pytest.mark.asyncio
+async def test_sinks_write_byte_ranges(tmp_path):
+    path = str(tmp_path / "file.bin")
+    writer = DiskWriter(buffer_size=4)
+    await writer.preallocate(path, 8)
+
+    for start, data in [(4, b"5678"), (0, b"1234")]:
+        async with await writer.open(path, offset=start, truncate=False) as sink:
+            await sink.write(data)
+
+    with open(path, "rb") as f:
+        assert f.read() == b"12345678"
+    writer.shutdown()